@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    def __init__(self, stats, cache_dir='.category_cache', ttl=86400):
+        self.stats = stats
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.stats,
+            cache_dir=crawler.settings.get('CATEGORY_CACHE_DIR', '.category_cache'),
+            ttl=crawler.settings.getint('CATEGORY_CACHE_TTL', 86400),
+        )
+
+    def path(self, name):
+        return os.path.join(self.cache_dir, f'{name}.json')
+
+    def read(self, name):
+        try:
+            with open(self.path(name)) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, name):
+        cached = self.read(name)
+        if self.ttl <= 0 or not cached or time.time() - cached['saved_at'] > self.ttl:
+            self.stats.inc_value('category_cache/miss')
+            return None
+
+        self.stats.inc_value('category_cache/hit')
+        return cached['categories']
+
+    def save(self, name, categories):
+        digest = hashlib.sha1(json.dumps(categories, sort_keys=True).encode()).hexdigest()
+        previous = self.read(name)
+        if previous and previous['digest'] != digest:
+            self.stats.inc_value('category_cache/changed')
+            logger.info('Category tree of %s changed since it was cached', name)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f'{self.path(name)}.tmp'
+        with open(temp_path, 'w') as cache_file:
+            json.dump({'saved_at': time.time(), 'digest': digest, 'categories': categories}, cache_file)
+        os.replace(temp_path, self.path(name))
+
+
+class NegativeCache:
+    def __init__(self, stats, path, ttl=7 * 86400):
+        self.stats = stats
+        self.path = path
+        self.ttl = ttl
+        self.failed_at = self.read()
+
+    @classmethod
+    def from_crawler(cls, crawler, name):
+        return cls(
+            crawler.stats,
+            os.path.join(crawler.settings.get('CATEGORY_CACHE_DIR', '.category_cache'), f'{name}-negative.json'),
+            ttl=crawler.settings.getint('NEGATIVE_CACHE_TTL', 7 * 86400),
+        )
+
+    def read(self):
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __contains__(self, key):
+        if (failed_at := self.failed_at.get(str(key))) is None:
+            return False
+
+        if time.time() - failed_at > self.ttl:
+            del self.failed_at[str(key)]
+            self.stats.inc_value('negative_cache/reprobed')
+            return False
+
+        self.stats.inc_value('negative_cache/skipped')
+        return True
+
+    def add(self, key):
+        self.failed_at[str(key)] = time.time()
+        self.stats.inc_value('negative_cache/added')
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as cache_file:
+            json.dump(self.failed_at, cache_file)
+        os.replace(temp_path, self.path)
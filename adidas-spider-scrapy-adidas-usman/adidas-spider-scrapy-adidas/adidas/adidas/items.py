@@ -12,4 +12,3 @@ class AdidasItem(scrapy.Item):
     description = scrapy.Field()
     image_url = scrapy.Field()
     skus = scrapy.Field()
-    request = scrapy.Field()
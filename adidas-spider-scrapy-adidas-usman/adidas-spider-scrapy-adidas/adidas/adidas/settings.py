@@ -7,3 +7,25 @@ TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 FEED_EXPORT_ENCODING = "utf-8"
 FEED_FORMAT = 'json'
 FEED_URI = 'out.json'
+
+# Columnar feed: a products file plus a flattened one-row-per-SKU file written in
+# row groups, e.g. `scrapy crawl <spider> -O out.parquet:parquet` (SKUs go to out_skus.parquet)
+FEED_EXPORTERS = {
+    'parquet': 'adidas.exporters.ParquetItemExporter',
+}
+ADIDAS_INVENTORY_BATCH_SIZE = 20
+
+# Default listing page size, and the largest page size to probe for (0 disables probing)
+LISTING_PAGE_SIZE = 6
+LISTING_PAGE_SIZE_PROBE = 100
+
+# Seconds a learned listing page size is trusted before probing again (0 probes every run)
+LISTING_PAGE_SIZE_TTL = 604800
+
+# On-disk navigation/category cache, used to skip the navigation request
+# while the cached tree is younger than CATEGORY_CACHE_TTL seconds (0 disables it)
+CATEGORY_CACHE_DIR = '.category_cache'
+CATEGORY_CACHE_TTL = 86400
+
+# Seconds before an article that returned the detail error page is requested again
+NEGATIVE_CACHE_TTL = 604800
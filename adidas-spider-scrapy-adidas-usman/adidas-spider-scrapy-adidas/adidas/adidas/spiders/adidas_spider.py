@@ -1,6 +1,9 @@
-from scrapy import Spider, Request
+from scrapy import Spider, Request, signals
+from scrapy.exceptions import DontCloseSpider
 
+from adidas.cache import CategoryCache, NegativeCache
 from adidas.items import AdidasItem
+from adidas.pagination import PageSizeProbe, PaginationPlanner
 
 
 class Mixin:
@@ -14,10 +17,10 @@ class Mixin:
     SITE_URL = 'https://www.adidas.com.cn'
 
     listings_api_t = 'https://ecp-public.api.adidas.com.cn/o2srh/v1/pub/platform-products/search?'\
-                     'page={page}&pageSize=6&abTest=A&contentId={content_id}'
+                     'page={page}&pageSize={page_size}&abTest=A&contentId={content_id}'
 
     sku_api_t = 'https://ecp-public.api.adidas.com.cn/o2inv/v1/pub/inv-query/batch/'\
-                'article-shop-inv?articleIdList={article_id}'
+                'article-shop-inv?articleIdList={article_ids}'
 
     product_detail_api_t = 'https://ecp-public.api.adidas.com.cn/o2pcm/v1/pub/platform-products/'\
                            'detail?articleId={article_id}'
@@ -33,43 +36,117 @@ class Mixin:
 class AdidasCrawlSpider(Spider, Mixin):
     name = 'adidas-crawl'
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.pagination = PaginationPlanner(crawler.stats, first_page=0)
+        spider.page_size_probe = PageSizeProbe.from_crawler(crawler, spider.name)
+        spider.category_cache = CategoryCache.from_crawler(crawler)
+        spider.negative_cache = NegativeCache.from_crawler(crawler, spider.name)
+        spider.product_parser = AdidasParserSpider(
+            inventory_batch_size=crawler.settings.getint('ADIDAS_INVENTORY_BATCH_SIZE', 20),
+            negative_cache=spider.negative_cache,
+            stats=crawler.stats
+        )
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        return spider
+
+    def spider_closed(self):
+        self.negative_cache.save()
+
+    def spider_idle(self):
+        if stock_request := self.product_parser.stock_request():
+            self.crawler.engine.crawl(stock_request)
+            raise DontCloseSpider
+
     def start_requests(self):
+        if categories_id := self.category_cache.load(self.name):
+            yield from self.category_requests(categories_id)
+            return
+
         yield Request(self.start_urls[0], self.parse, headers=self.headers)
 
+    def listings_url(self, content_id, page, page_size):
+        return self.listings_api_t.format(page=page, page_size=page_size, content_id=content_id)
+
+    def category_request(self, content_id, page_size):
+        return Request(
+            self.listings_url(content_id, self.pagination.first_page, page_size),
+            self.parse_pagination, errback=self.listing_failed,
+            headers=self.headers, meta={'content_id': content_id, 'page_size': page_size}
+        )
+
+    def category_requests(self, categories_id):
+        return [
+            self.category_request(content_id, self.page_size_probe.page_size) for content_id in categories_id
+        ]
+
+    def listing_failed(self, failure):
+        meta = failure.request.meta
+        if meta['page_size'] != self.page_size_probe.default_size:
+            self.page_size_probe.failed(failure)
+            yield self.category_request(meta['content_id'], self.page_size_probe.default_size)
+
     def parse(self, response):
         categories_id = [raw_category['contentId'] for raw_category in response.json()['content']]
-        yield from [
-            Request(
-                self.listings_api_t.format(page=0, content_id=content_id), self.parse_pagination,
-                headers=self.headers, meta={'content_id': content_id}
-            ) for content_id in categories_id
-        ]
+        self.category_cache.save(self.name, categories_id)
+        yield from self.category_requests(categories_id)
 
     def parse_pagination(self, response):
         yield from self.parse_products(response)
+        listing = response.json()
         content_id = response.meta['content_id']
+        page_size = response.meta['page_size']
+
+        if (total_count := listing.get('totalElements')) is not None:
+            page_size = self.page_size_probe.honoured_size(page_size, len(listing['content']), total_count)
+            total_pages = self.pagination.total_pages(total_count, page_size)
+        else:
+            total_pages = listing['totalPages']
 
+        last_page = self.pagination.first_page + total_pages - 1
         yield from [
             Request(
-                self.listings_api_t.format(page=page, content_id=content_id),
+                self.listings_url(content_id, page, page_size),
                 self.parse_products, headers=self.headers,
-            ) for page in range(1, response.json()['totalPages'] + 1)
+                meta={'content_id': content_id, 'page_size': page_size, 'is_last_page': page == last_page}
+            ) for page in self.pagination.remaining_pages(total_pages)
         ]
 
     def parse_products(self, response):
+        products = self.pagination.record_page(response.json()['content'])
+        is_last_page = response.meta.get('is_last_page', True)
+        if self.page_size_probe.is_shrunk(response.meta['page_size'], len(products), is_last_page):
+            yield self.category_request(response.meta['content_id'], self.page_size_probe.default_size)
+
         yield from [
             Request(
                 self.product_detail_api_t.format(article_id=product['articleId']),
-                AdidasParserSpider().parse, headers=self.headers
-            ) for product in response.json()['content']
+                self.product_parser.parse, headers=self.headers,
+                meta={'article_id': product['articleId']}
+            ) for product in products if product['articleId'] not in self.negative_cache
         ]
 
 
 class AdidasParserSpider(Spider, Mixin):
     name = 'adidas-parser'
+    inventory_batch_size = 20
+    negative_cache = None
+    stats = None
+    error_marker = b'<PlatformProductDetailExpandVO>'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_garments = {}
+
+    def is_error_response(self, response):
+        return self.error_marker in response.body[:256]
 
     def parse(self, response):
-        if '<PlatformProductDetailExpandVO>' in response.text:
+        if self.is_error_response(response):
+            if self.negative_cache is not None:
+                self.negative_cache.add(response.meta['article_id'])
             return
 
         raw_product = response.json()
@@ -84,22 +161,61 @@ class AdidasParserSpider(Spider, Mixin):
         garment['description'] = []
         garment['care'] = []
         garment['skus'] = self.product_skus(raw_product)
-        garment['request'] = [self.stock_request(garment)]
 
-        yield self.next_request_or_garment(garment)
+        self.pending_garments[garment['retailer_sku']] = garment
+        if len(self.pending_garments) >= self.inventory_batch_size:
+            yield self.stock_request()
 
     def parse_product_skus(self, response):
-        garment = response.meta['garment']
-        sku_details = response.json()[0]['articleStockSkuVOList']
+        try:
+            stock_details = {
+                stock['articleId']: stock['articleStockSkuVOList'] for stock in response.json()
+            }
+        except (ValueError, KeyError, TypeError):
+            self.logger.warning('Unreadable stock response for %d garments: %s', len(response.meta['garments']),
+                                response.text[:200])
+            self.inc_stat('adidas/stock_batches_failed')
+            yield from self.garments_without_stock(response.meta['garments'])
+            return
+
+        missing_garments = {}
+        for article_id, garment in response.meta['garments'].items():
+            if article_id not in stock_details:
+                missing_garments[article_id] = garment
+                continue
+
+            stock_index = self.stock_index(stock_details[article_id])
 
-        for sku_id, sku in garment['skus'].items():
-            stock_detail = next((detail for detail in sku_details if detail['sizeName'] == sku['size']), None)
-            sku['out_of_stock'] = not stock_detail['available']
+            for sku in garment['skus'].values():
+                sku['out_of_stock'] = not stock_index.get(sku['size'], False)
 
-        return self.next_request_or_garment(garment)
+            yield garment
 
-    def next_request_or_garment(self, garment):
-        return garment['request'].pop() if garment['request'] else garment
+        if missing_garments:
+            self.logger.warning('Stock response had no entry for %d garments', len(missing_garments))
+            yield from self.garments_without_stock(missing_garments)
+
+    def stock_failed(self, failure):
+        garments = failure.request.meta['garments']
+        self.logger.warning('Stock lookup failed for %d garments: %s', len(garments), failure.getErrorMessage())
+        self.inc_stat('adidas/stock_batches_failed')
+        yield from self.garments_without_stock(garments)
+
+    def inc_stat(self, key, count=1):
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    def garments_without_stock(self, garments):
+        self.inc_stat('adidas/garments_without_stock', len(garments))
+
+        for garment in garments.values():
+            for sku in garment['skus'].values():
+                sku['out_of_stock'] = None
+
+            yield garment
+
+    def stock_index(self, sku_details):
+        return {detail['sizeName']: detail['available'] for detail in sku_details}
 
     def product_skus(self, raw_product):
         skus = {}
@@ -144,10 +260,15 @@ class AdidasParserSpider(Spider, Mixin):
     def product_color(self, raw_product):
         return raw_product['colorDisplay']
 
-    def stock_request(self, garment):
+    def stock_request(self):
+        if not self.pending_garments:
+            return None
+
+        garments, self.pending_garments = self.pending_garments, {}
         return Request(
-            self.sku_api_t.format(article_id=garment['retailer_sku']),
+            self.sku_api_t.format(article_ids=','.join(map(str, garments))),
             self.parse_product_skus,
+            errback=self.stock_failed,
             headers=self.headers,
-            meta={'garment': garment}
+            meta={'garments': garments}
         )
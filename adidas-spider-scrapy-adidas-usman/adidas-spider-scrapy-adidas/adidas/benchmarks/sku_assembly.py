@@ -0,0 +1,62 @@
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'tests')]
+
+from adidas.spiders.adidas_spider import AdidasParserSpider  # noqa: E402
+from stock_payloads import garment, stock_details, stock_response  # noqa: E402
+from test_skus import list_scan_stock  # noqa: E402
+
+
+def timed(function, setup, repeat):
+    elapsed = 0
+    for _ in range(repeat):
+        argument = setup()
+        started = time.perf_counter()
+        result = function(argument)
+        elapsed += time.perf_counter() - started
+    return result, elapsed / repeat
+
+
+def fresh_response(garments, stocks):
+    response = stock_response(copy.deepcopy(garments), stocks)
+    response.json()
+    return response
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time Adidas stock assignment on garments with many sizes.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 300, 1000])
+    parser.add_argument('--batch', type=int, default=20, help='Garments per inventory request')
+    parser.add_argument('--repeat', type=int, default=20)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    parser = AdidasParserSpider()
+    print(f'{"sizes":>6} {"garments":>9} {"list scan":>12} {"indexed":>12} {"speedup":>8}')
+    for sizes in args.sizes:
+        article_ids = [f'GZ{index:04d}' for index in range(args.batch)]
+        garments = {article_id: garment(parser, article_id, sizes) for article_id in article_ids}
+        stocks = [stock_details(article_id, sizes) for article_id in article_ids]
+
+        expected, list_scan = timed(lambda fresh_garments: [
+            list_scan_stock(fresh_garments[stock['articleId']], stock['articleStockSkuVOList'])
+            for stock in stocks
+        ], lambda: copy.deepcopy(garments), args.repeat)
+        results, indexed = timed(
+            lambda response: list(parser.parse_product_skus(response)),
+            lambda: fresh_response(garments, stocks), args.repeat
+        )
+        assert results == expected
+        print(f'{sizes:>6} {args.batch:>9} {list_scan * 1000:>9.3f} ms {indexed * 1000:>9.3f} ms '
+              f'{list_scan / indexed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
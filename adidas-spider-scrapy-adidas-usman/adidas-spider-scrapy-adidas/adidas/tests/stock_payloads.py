@@ -0,0 +1,34 @@
+import json
+
+from scrapy import Request
+from scrapy.http import TextResponse
+
+from adidas.spiders.adidas_spider import AdidasParserSpider
+
+
+def raw_product(article_id, sizes):
+    return {
+        'articleId': article_id,
+        'colorDisplay': 'Core Black',
+        'salePrice': 899.0,
+        'skuList': [{'sizeName': f'{36 + index * 0.5:g}'} for index in range(sizes)],
+    }
+
+
+def garment(parser, article_id, sizes):
+    return {'retailer_sku': article_id, 'skus': parser.product_skus(raw_product(article_id, sizes))}
+
+
+def stock_details(article_id, sizes, available_every=2):
+    return {
+        'articleId': article_id,
+        'articleStockSkuVOList': [
+            {'sizeName': f'{36 + index * 0.5:g}', 'available': index % available_every == 0}
+            for index in reversed(range(sizes))
+        ],
+    }
+
+
+def stock_response(garments, stocks):
+    request = Request(AdidasParserSpider.sku_api_t.format(article_ids=','.join(garments)), meta={'garments': garments})
+    return TextResponse(request.url, body=json.dumps(stocks).encode(), request=request)
@@ -0,0 +1,48 @@
+import copy
+
+import pytest
+
+from adidas.spiders.adidas_spider import AdidasParserSpider
+from stock_payloads import garment, stock_details, stock_response
+
+
+def list_scan_stock(garment, sku_details):
+    for sku in garment['skus'].values():
+        stock_detail = next((detail for detail in sku_details if detail['sizeName'] == sku['size']), None)
+        sku['out_of_stock'] = not stock_detail['available']
+    return garment
+
+
+@pytest.mark.parametrize('sizes, available_every', [(1, 1), (8, 2), (12, 3), (400, 2), (400, 1)])
+def test_batched_stock_matches_the_list_scan(sizes, available_every):
+    parser = AdidasParserSpider()
+    article_ids = [f'GZ{index:04d}' for index in range(3)]
+    garments = {article_id: garment(parser, article_id, sizes) for article_id in article_ids}
+    stocks = [stock_details(article_id, sizes, available_every) for article_id in article_ids]
+    expected = [
+        list_scan_stock(copy.deepcopy(garments[stock['articleId']]), stock['articleStockSkuVOList'])
+        for stock in stocks
+    ]
+
+    assert list(parser.parse_product_skus(stock_response(garments, stocks))) == expected
+
+
+def test_sizes_missing_from_an_article_stock_list_are_out_of_stock():
+    parser = AdidasParserSpider()
+    garments = {'GZ0001': garment(parser, 'GZ0001', 4)}
+    stocks = [stock_details('GZ0001', 2, available_every=1)]
+
+    results = list(parser.parse_product_skus(stock_response(garments, stocks)))
+
+    assert [sku['out_of_stock'] for sku in results[0]['skus'].values()] == [False, False, True, True]
+
+
+def test_articles_missing_from_the_stock_response_have_unknown_stock():
+    parser = AdidasParserSpider()
+    garments = {'GZ0001': garment(parser, 'GZ0001', 4), 'GZ0002': garment(parser, 'GZ0002', 4)}
+    stocks = [stock_details('GZ0001', 2, available_every=1)]
+
+    results = {result['retailer_sku']: result for result in parser.parse_product_skus(stock_response(garments, stocks))}
+
+    assert [sku['out_of_stock'] for sku in results['GZ0001']['skus'].values()] == [False, False, True, True]
+    assert all(sku['out_of_stock'] is None for sku in results['GZ0002']['skus'].values())
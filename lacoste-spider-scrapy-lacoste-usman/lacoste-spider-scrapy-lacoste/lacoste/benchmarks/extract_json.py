@@ -0,0 +1,76 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'tests')]
+
+from lacoste.spiders import lacoste_spider  # noqa: E402
+from lacoste.spiders.lacoste_spider import LacosteParser  # noqa: E402
+from product_payloads import HTML_PREFIX, configurable_product, product_detail_body  # noqa: E402
+
+
+def split_on_html_end(body):
+    product_parts = body.decode('utf-8').split('</html>')
+    product_json_str = product_parts[1].strip() if len(product_parts) > 1 else product_parts[0].strip()
+    return json.loads(product_json_str)
+
+
+def extract_with_json(body):
+    orjson, lacoste_spider.orjson = lacoste_spider.orjson, None
+    try:
+        return LacosteParser().extract_json_from_response(body)
+    finally:
+        lacoste_spider.orjson = orjson
+
+
+def measure(extract, body, repeat):
+    extract(body)
+    tracemalloc.start()
+    result = extract(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        extract(body)
+    return peak, peak - retained, (time.perf_counter() - started) / repeat
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure peak allocations of Lacoste productDetail JSON extraction.')
+    parser.add_argument('--products', type=int, default=32, help='Products per response (one GraphQL batch)')
+    parser.add_argument('--sizes', type=int, default=12)
+    parser.add_argument('--colours', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=20)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    products = [
+        configurable_product(f'PH{index:04d}-00', args.sizes, args.colours, available_every=1)
+        for index in range(args.products)
+    ]
+    extractors = {
+        'decode + split + json': split_on_html_end,
+        'bytes + json': extract_with_json,
+    }
+    if lacoste_spider.orjson:
+        extractors['bytes + orjson'] = LacosteParser().extract_json_from_response
+
+    for shape, body in [('html prefix', product_detail_body(products, HTML_PREFIX)),
+                        ('pure json', product_detail_body(products))]:
+        print(f'{shape}: {len(body) / 1024 / 1024:.1f} MB body')
+        for name, extract in extractors.items():
+            peak, transient, seconds = measure(extract, body, args.repeat)
+            print(f'  {name:<22} peak {peak / 1024 / 1024:7.2f} MB  '
+                  f'transient {transient / 1024 / 1024:6.2f} MB  {seconds * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'tests')]
+
+from lacoste.spiders.lacoste_spider import LacosteParser  # noqa: E402
+from product_payloads import configurable_product  # noqa: E402
+from test_skus import list_scan_sku_details  # noqa: E402
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time Lacoste SKU assembly on products with many variants.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 300, 1000])
+    parser.add_argument('--colours', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    parser = LacosteParser()
+    print(f'{"variants":>9} {"options":>8} {"list scan":>12} {"indexed":>12} {"speedup":>8}')
+    for sizes in args.sizes:
+        product = configurable_product('PH4012-00', sizes, args.colours, available_every=2)
+        expected, list_scan = timed(lambda: list_scan_sku_details(parser, product), args.repeat)
+        skus, indexed = timed(lambda: parser.product_sku_details(product), args.repeat)
+        assert skus == expected
+        options = sum(len(option['values']) for option in product['configurable_options'])
+        print(f'{len(product["variants"]):>9} {options:>8} {list_scan * 1000:>9.3f} ms {indexed * 1000:>9.3f} ms '
+              f'{list_scan / indexed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    def __init__(self, stats, cache_dir='.category_cache', ttl=86400):
+        self.stats = stats
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.stats,
+            cache_dir=crawler.settings.get('CATEGORY_CACHE_DIR', '.category_cache'),
+            ttl=crawler.settings.getint('CATEGORY_CACHE_TTL', 86400),
+        )
+
+    def path(self, name):
+        return os.path.join(self.cache_dir, f'{name}.json')
+
+    def read(self, name):
+        try:
+            with open(self.path(name)) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, name):
+        cached = self.read(name)
+        if self.ttl <= 0 or not cached or time.time() - cached['saved_at'] > self.ttl:
+            self.stats.inc_value('category_cache/miss')
+            return None
+
+        self.stats.inc_value('category_cache/hit')
+        return cached['categories']
+
+    def save(self, name, categories):
+        digest = hashlib.sha1(json.dumps(categories, sort_keys=True).encode()).hexdigest()
+        previous = self.read(name)
+        if previous and previous['digest'] != digest:
+            self.stats.inc_value('category_cache/changed')
+            logger.info('Category tree of %s changed since it was cached', name)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f'{self.path(name)}.tmp'
+        with open(temp_path, 'w') as cache_file:
+            json.dump({'saved_at': time.time(), 'digest': digest, 'categories': categories}, cache_file)
+        os.replace(temp_path, self.path(name))
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import re
+
+from scrapy import Request
+from scrapy.utils.request import RequestFingerprinter
+
+NAVIGATION_MENU_QUERY = """
+query navigationMenu($id: Int!) {
+  category(id: $id) {
+    id
+    name
+    description
+    children {
+      id
+      url_path
+      children {
+        id
+        position
+        url_path
+        children {
+          id
+          url_path
+          children {
+            id
+            url_path
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+CATEGORY_QUERY = """
+query category(
+  $id: Int!,
+  $pageSize: Int!,
+  $currentPage: Int!,
+  $filter: ProductAttributeFilterInput,
+  $sort: ProductAttributeSortInput
+) {
+  category(id: $id) {
+    id
+    description
+    name
+    name_en
+    image
+    product_count
+  }
+  products(
+    pageSize: $pageSize,
+    currentPage: $currentPage,
+    filter: $filter,
+    sort: $sort
+  ) {
+    items {
+      id
+      meta_description
+      name
+      item_category
+      item_category2
+      item_category3
+      item_category4
+      item_category5
+      url_key
+      price {
+        regularPrice {
+          amount {
+            value
+            currency
+          }
+        }
+      }
+      lacoste_colours
+    }
+    page_info {
+      total_pages
+    }
+    total_count
+  }
+}
+"""
+
+PRODUCT_DETAIL_QUERY = """
+query productDetail($urlKeys: [String], $pageSize: Int!) {
+    productDetail: products(filter: {url_key: {in: $urlKeys}}, pageSize: $pageSize) {
+        items {
+            __typename
+            meta_description
+            name
+            item_category
+            item_category3
+            price {
+                regularPrice {
+                    amount {
+                        currency
+                        value
+                    }
+                }
+            }
+            sku
+            care_instructions
+            url_key
+            ... on ConfigurableProduct {
+                configurable_options {
+                    attribute_code
+                    attribute_id
+                    label
+                    values {
+                        label
+                        value_index
+                    }
+                }
+                variants {
+                    attributes {
+                        code
+                        value_index
+                    }
+                    product {
+                        media_gallery_entries {
+                            file
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+QUERIES = {
+    'navigationMenu': NAVIGATION_MENU_QUERY,
+    'category': CATEGORY_QUERY,
+    'productDetail': PRODUCT_DETAIL_QUERY,
+}
+
+
+def minify_query(query):
+    return re.sub(r' ?([{}():,!]) ?', r'\1', ' '.join(query.split()))
+
+
+def dump_json(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class GraphQLClient:
+    PERSISTED_QUERY_ERROR = b'PersistedQueryNot'
+
+    def __init__(self, url, headers, queries=QUERIES, persisted_queries=False):
+        self.url = url
+        self.headers = headers
+        self.persisted_queries = persisted_queries
+        self.query_bodies = {}
+        self.persisted_bodies = {}
+
+        for operation_name, query in queries.items():
+            query = minify_query(query)
+            body = {'operationName': operation_name, 'query': query}
+            if persisted_queries:
+                body['extensions'] = self.persisted_query_extension(query)
+                self.persisted_bodies[operation_name] = self.body_template({
+                    'operationName': operation_name,
+                    'extensions': body['extensions'],
+                })
+            self.query_bodies[operation_name] = self.body_template(body)
+
+    def persisted_query_extension(self, query):
+        return {
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashlib.sha256(query.encode()).hexdigest(),
+            }
+        }
+
+    def body_template(self, body):
+        return dump_json(body)[:-1] + b',"variables":'
+
+    def body(self, operation_name, variables, full_query=True):
+        templates = self.query_bodies if full_query else self.persisted_bodies
+        return templates[operation_name] + dump_json(variables) + b'}'
+
+    def request(self, operation_name, variables, callback, meta=None, errback=None, dont_filter=False):
+        meta = meta or {}
+        if self.persisted_queries:
+            meta = {**meta, 'graphql_callback': callback}
+            callback = self.parse_persisted_query
+
+        return Request(
+            url=self.url,
+            method='POST',
+            headers=self.headers,
+            body=self.body(operation_name, variables, full_query=not self.persisted_queries),
+            callback=callback,
+            errback=errback,
+            meta={**meta, 'graphql': (operation_name, variables)},
+            dont_filter=dont_filter
+        )
+
+    def parse_persisted_query(self, response):
+        is_persisted_query_miss = self.PERSISTED_QUERY_ERROR in response.body[:256]
+        if is_persisted_query_miss and not response.meta.get('graphql_full_query'):
+            operation_name, variables = response.meta['graphql']
+            yield response.request.replace(
+                body=self.body(operation_name, variables),
+                meta={**response.meta, 'graphql_full_query': True},
+                dont_filter=True
+            )
+            return
+
+        yield from response.meta['graphql_callback'](response) or ()
+
+
+class GraphQLRequestFingerprinter:
+    IGNORED_VARIABLES = ('onServer', 'idString')
+
+    def __init__(self, crawler=None):
+        self.default_fingerprinter = RequestFingerprinter(crawler)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def normalise(self, value):
+        if isinstance(value, dict):
+            return {
+                key: self.normalise(item) for key, item in value.items()
+                if key not in self.IGNORED_VARIABLES
+            }
+        if isinstance(value, list):
+            items = [self.normalise(item) for item in value]
+            return sorted(items) if all(isinstance(item, str) for item in items) else items
+        return value
+
+    def graphql_operation(self, request):
+        if graphql := request.meta.get('graphql'):
+            return graphql
+        if request.method == 'POST' and request.url.endswith('/graphql'):
+            body = json.loads(request.body)
+            return body.get('operationName'), body.get('variables') or {}
+        return None
+
+    def fingerprint(self, request):
+        if not (graphql := self.graphql_operation(request)):
+            return self.default_fingerprinter.fingerprint(request)
+
+        operation_name, variables = graphql
+        canonical_request = [request.url, operation_name, self.normalise(variables)]
+        return hashlib.sha1(json.dumps(canonical_request, sort_keys=True).encode()).digest()
@@ -12,3 +12,4 @@ class LacosteItem(scrapy.Item):
     description = scrapy.Field()
     image_url = scrapy.Field()
     skus = scrapy.Field()
+    url_paths = scrapy.Field()
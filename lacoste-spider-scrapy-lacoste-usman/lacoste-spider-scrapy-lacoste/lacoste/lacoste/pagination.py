@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+from scrapy.spidermiddlewares.httperror import HttpError
+
+
+class PaginationPlanner:
+    def __init__(self, stats, first_page=0):
+        self.stats = stats
+        self.first_page = first_page
+
+    def total_pages(self, total_count, page_size):
+        return -(-total_count // page_size)
+
+    def remaining_pages(self, total_pages):
+        pages = range(self.first_page + 1, self.first_page + total_pages)
+        self.stats.inc_value('pagination/pages_planned', len(pages))
+        return pages
+
+    def record_page(self, items):
+        self.stats.inc_value('pagination/pages_fetched')
+        if not items:
+            self.stats.inc_value('pagination/wasted_fetches')
+        return items
+
+
+class PageSizeProbe:
+    REJECTION_STATUSES = (400, 413, 422)
+
+    def __init__(self, stats, cache_path, default_size, max_size=0, ttl=604800):
+        self.stats = stats
+        self.cache_path = cache_path
+        self.default_size = default_size
+        self.ttl = ttl
+        self.cached_size = self.load()
+        self.page_size = self.cached_size or max(default_size, max_size)
+
+    @classmethod
+    def from_crawler(cls, crawler, name):
+        settings = crawler.settings
+        return cls(
+            crawler.stats,
+            os.path.join(settings.get('CATEGORY_CACHE_DIR', '.category_cache'), f'{name}-page-size.json'),
+            settings.getint('LISTING_PAGE_SIZE'),
+            settings.getint('LISTING_PAGE_SIZE_PROBE', 0),
+            settings.getint('LISTING_PAGE_SIZE_TTL', 604800),
+        )
+
+    def load(self):
+        try:
+            with open(self.cache_path) as cache_file:
+                cached = json.load(cache_file)
+            if self.ttl <= 0 or time.time() - cached['saved_at'] > self.ttl:
+                return None
+            return cached['page_size']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, page_size):
+        self.page_size = page_size
+        if page_size == self.cached_size:
+            return
+
+        self.cached_size = page_size
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        with open(self.cache_path, 'w') as cache_file:
+            json.dump({'saved_at': time.time(), 'page_size': page_size}, cache_file)
+
+    def honoured_size(self, requested_size, received, total_count):
+        if received >= min(requested_size, total_count):
+            page_size = requested_size
+        else:
+            page_size = received or self.default_size
+            self.stats.inc_value('pagination/page_size_clamped')
+
+        self.save(page_size)
+        return page_size
+
+    def is_shrunk(self, page_size, received, is_last_page):
+        if is_last_page or received >= page_size:
+            return False
+
+        self.stats.inc_value('pagination/page_size_shrunk')
+        return True
+
+    def failed(self, failure):
+        if failure.check(HttpError) and failure.value.response.status in self.REJECTION_STATUSES:
+            self.reject()
+        else:
+            self.stats.inc_value('pagination/page_size_probe_errors')
+
+    def reject(self):
+        self.stats.inc_value('pagination/page_size_rejected')
+        self.save(self.default_size)
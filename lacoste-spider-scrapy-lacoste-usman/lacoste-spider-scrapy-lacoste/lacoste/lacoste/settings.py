@@ -89,11 +89,18 @@ ROBOTSTXT_OBEY = True
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
+REQUEST_FINGERPRINTER_CLASS = "lacoste.graphql.GraphQLRequestFingerprinter"
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 FEED_EXPORT_ENCODING = "utf-8"
 FEED_FORMAT = 'json'
 FEED_URI = 'out.json'
 
+# Columnar feed: a products file plus a flattened one-row-per-SKU file written in
+# row groups, e.g. `scrapy crawl <spider> -O out.parquet:parquet` (SKUs go to out_skus.parquet)
+FEED_EXPORTERS = {
+    'parquet': 'lacoste.exporters.ParquetItemExporter',
+}
+
 # Proxies List
 ROTATING_PROXY_LIST = [
     '186.121.235.66:8080',
@@ -109,3 +116,26 @@ DOWNLOADER_MIDDLEWARES = {
     'rotating_proxies.middlewares.RotatingProxyMiddleware': 610,
     'rotating_proxies.middlewares.BanDetectionMiddleware': 620,
 }
+
+# Default listing page size, and the largest page size to probe for (0 disables probing)
+LISTING_PAGE_SIZE = 32
+LISTING_PAGE_SIZE_PROBE = 200
+
+# Seconds a learned listing page size is trusted before probing again (0 probes every run)
+LISTING_PAGE_SIZE_TTL = 604800
+
+# Number of url_keys requested per productDetail GraphQL query
+LACOSTE_PRODUCT_BATCH_SIZE = 32
+
+# Parsed products held back so url_paths from later categories can still be merged in;
+# once this many are held they are emitted early to bound memory
+LACOSTE_PRODUCT_FLUSH_SIZE = 500
+
+# Send only the sha256 hash of each GraphQL query, falling back to the full
+# query text when the server has not seen it yet
+LACOSTE_GRAPHQL_PERSISTED_QUERIES = False
+
+# On-disk navigation/category cache, used to skip the navigation request
+# while the cached tree is younger than CATEGORY_CACHE_TTL seconds (0 disables it)
+CATEGORY_CACHE_DIR = '.category_cache'
+CATEGORY_CACHE_TTL = 86400
@@ -1,8 +1,21 @@
 import json
+import re
 
-from scrapy import Request, Spider
+from scrapy import Request, Spider, signals
+from scrapy.exceptions import DontCloseSpider
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from lacoste.cache import CategoryCache
+from lacoste.graphql import GraphQLClient
 from lacoste.items import LacosteItem
+from lacoste.pagination import PageSizeProbe, PaginationPlanner
+
+HTML_END = b'</html>'
+JSON_START_RE = re.compile(rb'\s*[{\[]')
 
 
 class LacosteSpider(Spider):
@@ -13,165 +26,55 @@ class LacosteSpider(Spider):
         'Content-Type': 'application/json',
     }
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.pagination = PaginationPlanner(crawler.stats, first_page=1)
+        spider.page_size_probe = PageSizeProbe.from_crawler(crawler, spider.name)
+        spider.graphql = GraphQLClient(
+            spider.start_urls, spider.headers,
+            persisted_queries=crawler.settings.getbool('LACOSTE_GRAPHQL_PERSISTED_QUERIES')
+        )
+        spider.category_cache = CategoryCache.from_crawler(crawler)
+        spider.product_url_paths = {}
+        spider.products = []
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
+    def spider_idle(self):
+        if self.products:
+            # Local data: request, kept away from the rotating proxies and non-empty so it is not taken for a ban
+            flush_request = Request('data:,flush', self.flush_products, dont_filter=True, meta={'proxy': None})
+            self.crawler.engine.crawl(flush_request)
+            raise DontCloseSpider
+
+    def flush_products(self, response):
+        products, self.products = self.products, []
+        yield from products
+
     def start_requests(self):
-        home_page_payload = {
-            "operationName": "navigationMenu",
-            "query": """
-            query navigationMenu($id: Int!) {
-              category(id: $id) {
-                id
-                name
-                description
-                children {
-                  id
-                  url_path
-                  children {
-                    id
-                    position
-                    url_path
-                    children {
-                      id
-                      url_path
-                      children {
-                        id
-                        url_path
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          """,
-            "variables": {
-                "id": 2
-            }
-        }
+        if sub_categories := self.category_cache.load(self.name):
+            yield from self.category_requests(sub_categories)
+            return
 
-        yield Request(
-            url=self.start_urls,
-            method='POST',
-            headers=self.headers,
-            body=json.dumps(home_page_payload),
-            callback=self.parse,
-            dont_filter=True
-        )
+        yield self.graphql.request('navigationMenu', {'id': 2}, self.parse)
 
-    def get_listings_payload(self, id_value, current_page=1):
+    def get_listings_variables(self, id_value, current_page, page_size):
         return {
-            "operationName": "category",
-            "query": """
-            query category(
-                    $id: Int!,
-                    $pageSize: Int!,
-                    $currentPage: Int!,
-                    $filter: ProductAttributeFilterInput,
-                    $sort: ProductAttributeSortInput
-            ) {
-              category(id: $id) {
-                id
-                description
-                name
-                name_en
-                image
-                product_count
-              }
-              products(
-                pageSize:
-                $pageSize,
-                currentPage: $currentPage,
-                filter: $filter,
-                sort: $sort
-              ) {
-                items {
-                  id
-                  meta_description
-                  name
-                  item_category
-                  item_category2
-                  item_category3
-                  item_category4
-                  item_category5
-                  url_key
-                  price {
-                    regularPrice {
-                      amount {
-                        value
-                        currency
-                      }
-                    }
-                  }
-                  lacoste_colours
-                }
-                page_info {
-                  total_pages
-                }
-                total_count
-              }
-            }""",
-            "variables": {
-                "currentPage": current_page,
-                "id": id_value,
-                "idString": str(id_value),
-                "onServer": True,
-                "pageSize": 32,
-                "filter": {"category_id": {"eq": str(id_value)}},
-                "sort": {"position": "DESC"}
-            }
+            "currentPage": current_page,
+            "id": id_value,
+            "idString": str(id_value),
+            "onServer": True,
+            "pageSize": page_size,
+            "filter": {"category_id": {"eq": str(id_value)}},
+            "sort": {"position": "DESC"}
         }
 
-    def get_product_payload(self, url_key):
+    def get_products_variables(self, url_keys):
         return {
-            "operationName": "productDetail",
-            "query": """
-                query productDetail($urlKey: String) {
-                    productDetail: products(filter: {url_key: {eq: $urlKey}}) {
-                        items {
-                            __typename
-                            meta_description
-                            name
-                            item_category
-                            item_category3
-                            price {
-                                regularPrice {
-                                    amount {
-                                        currency
-                                        value
-                                    }
-                                }
-                            }
-                            sku
-                            care_instructions
-                            url_key
-                            ... on ConfigurableProduct {
-                                configurable_options {
-                                    attribute_code
-                                    attribute_id
-                                    label
-                                    values {
-                                        label
-                                        value_index
-                                    }
-                                }
-                                variants {
-                                    attributes {
-                                        code
-                                        value_index
-                                    }
-                                    product {
-                                        media_gallery_entries {
-                                            file
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            """,
-            "variables": {
-                "onServer": True,
-                "urlKey": url_key
-            }
+            "onServer": True,
+            "urlKeys": url_keys,
+            "pageSize": len(url_keys)
         }
 
     def remove_second_to_last_word(self, s):
@@ -180,61 +83,91 @@ class LacosteSpider(Spider):
             del parts[-2]
         return '-'.join(parts)
 
+    def batch_url_keys(self, url_keys):
+        batch_size = self.settings.getint('LACOSTE_PRODUCT_BATCH_SIZE', 32)
+        return [url_keys[i:i + batch_size] for i in range(0, len(url_keys), batch_size)]
+
+    def new_url_keys(self, url_keys, url_path):
+        new_url_keys = []
+
+        for url_key in dict.fromkeys(url_keys):
+            if url_paths := self.product_url_paths.get(url_key):
+                if url_path not in url_paths:
+                    url_paths.append(url_path)
+                self.crawler.stats.inc_value('lacoste/detail_requests_avoided')
+            else:
+                self.product_url_paths[url_key] = [url_path]
+                new_url_keys.append(url_key)
+
+        return new_url_keys
+
+    def parse_product_details(self, response):
+        self.products.extend(LacosteParser().parse(response))
+        if len(self.products) >= self.settings.getint('LACOSTE_PRODUCT_FLUSH_SIZE', 500):
+            self.crawler.stats.inc_value('lacoste/early_product_flushes')
+            yield from self.flush_products(response)
+
     def parse_products(self, response):
-        parser = LacosteParser()
         raw_products = response.json()['data']
-        products = raw_products['products']['items']
-
-        for product in products:
-            url_key = self.remove_second_to_last_word(product['url_key'])
-            yield Request(
-                url=self.start_urls,
-                method='POST',
-                headers=self.headers,
-                body=json.dumps(self.get_product_payload(url_key)),
-                callback=parser.parse,
+        products = self.pagination.record_page(raw_products['products']['items'])
+        is_last_page = response.meta.get('is_last_page', True)
+        if self.page_size_probe.is_shrunk(response.meta['page_size'], len(products), is_last_page):
+            yield self.category_request(
+                response.meta['id'], response.meta['url_path'], self.page_size_probe.default_size
+            )
+
+        url_keys = self.new_url_keys(
+            (self.remove_second_to_last_word(product['url_key']) for product in products),
+            response.meta['url_path']
+        )
+
+        for url_keys_batch in self.batch_url_keys(url_keys):
+            yield self.graphql.request(
+                'productDetail',
+                self.get_products_variables(url_keys_batch),
+                self.parse_product_details,
                 meta={
-                    'url_path': response.meta["url_path"],
-                    'url_key': url_key,
-                },
-                dont_filter=True
+                    'url_path': response.meta['url_path'],
+                    'url_paths': {url_key: self.product_url_paths[url_key] for url_key in url_keys_batch},
+                }
             )
 
     def parse_listings(self, response):
-        total_pages = response.meta['total_pages']
+        page_size = response.meta['page_size']
+        if response.json().get('errors') and page_size != self.page_size_probe.default_size:
+            self.page_size_probe.reject()
+            yield self.category_request(
+                response.meta['id'], response.meta['url_path'], self.page_size_probe.default_size
+            )
+            return
+
+        yield from self.parse_products(response)
+
+        products_page = response.json()['data']['products']
+        total_count = products_page['total_count']
+        page_size = self.page_size_probe.honoured_size(page_size, len(products_page['items']), total_count)
+        total_pages = self.pagination.total_pages(total_count, page_size)
+        last_page = self.pagination.first_page + total_pages - 1
         id_value = response.meta['id']
         yield from (
-            Request(
-                url=self.start_urls,
-                method='POST',
-                headers=self.headers,
-                body=json.dumps(self.get_listings_payload(id_value, page)),
-                callback=self.parse_products,
+            self.graphql.request(
+                'category',
+                self.get_listings_variables(id_value, page, page_size),
+                self.parse_products,
                 meta={
                     'id': id_value,
                     'url_path': response.meta['url_path'],
-                },
-                dont_filter=True
-            ) for page in range(1, total_pages + 1)
+                    'page_size': page_size,
+                    'is_last_page': page == last_page,
+                }
+            ) for page in self.pagination.remaining_pages(total_pages)
         )
 
-    def parse_total_pages_listings(self, response):
-        page_details = response.json()['data']
-        total_pages = page_details['products']['page_info']['total_pages']
-        id_value = response.meta['id']
-        yield Request(
-            url=self.start_urls,
-            method='POST',
-            headers=self.headers,
-            body=json.dumps(self.get_listings_payload(id_value)),
-            callback=self.parse_listings,
-            meta={
-                'id': id_value,
-                'url_path': response.meta['url_path'],
-                'total_pages': total_pages,
-            },
-            dont_filter=True
-        )
+    def listing_failed(self, failure):
+        meta = failure.request.meta
+        if meta['page_size'] != self.page_size_probe.default_size:
+            self.page_size_probe.failed(failure)
+            yield self.category_request(meta['id'], meta['url_path'], self.page_size_probe.default_size)
 
     def extract_last_sub_categories(self, item_list):
         result = []
@@ -250,25 +183,32 @@ class LacosteSpider(Spider):
 
         return result
 
+    def category_request(self, id_value, url_path, page_size):
+        return self.graphql.request(
+            'category',
+            self.get_listings_variables(id_value, self.pagination.first_page, page_size),
+            self.parse_listings,
+            meta={
+                'id': id_value,
+                'url_path': url_path,
+                'page_size': page_size,
+            },
+            errback=self.listing_failed
+        )
+
+    def category_requests(self, sub_categories):
+        return (
+            self.category_request(category['id'], category['url_path'], self.page_size_probe.page_size)
+            for category in sub_categories
+        )
+
     def parse(self, response):
         main_page_details = response.json()
         all_categories = main_page_details['data']['category']['children'][0]['children']
         sub_categories = self.extract_last_sub_categories(all_categories)
+        self.category_cache.save(self.name, sub_categories)
 
-        yield from (
-            Request(
-                url=self.start_urls,
-                method='POST',
-                headers=self.headers,
-                body=json.dumps(self.get_listings_payload(category['id'])),
-                callback=self.parse_total_pages_listings,
-                meta={
-                    'id': category['id'],
-                    'url_path': category['url_path']
-                },
-                dont_filter=True
-            ) for category in sub_categories
-        )
+        yield from self.category_requests(sub_categories)
 
 
 class LacosteParser(Spider):
@@ -309,32 +249,26 @@ class LacosteParser(Spider):
         config_options = product_details['configurable_options']
         return config_options[1]['values'][0]['label'] if len(config_options) > 1 else []
 
+    def available_value_indexes(self, product_details):
+        return {variant['attributes'][0]['value_index'] for variant in product_details['variants']}
+
+    def option_values(self, product_details):
+        return [value for option in product_details['configurable_options'] for value in option['values']]
+
     def product_available_sizes(self, product_details):
-        available_sizes = [
-            variant['attributes'][0]['value_index'] for variant in product_details['variants']
-        ]
+        available_sizes_id = self.available_value_indexes(product_details)
         return [
             value['label']
-            for option in product_details['configurable_options']
-            for value in option['values']
-            if value['value_index'] in available_sizes
+            for value in self.option_values(product_details)
+            if value['value_index'] in available_sizes_id
         ]
 
     def product_sku_details(self, product_details):
-        available_sizes_id = [
-            variant['attributes'][0]['value_index'] for variant in product_details['variants']
-        ]
-        all_sizes_label = [
-            value['label']
-            for option in product_details['configurable_options']
-            for value in option['values']
-        ]
-        available_sizes_label = [
-            value['label']
-            for option in product_details['configurable_options']
-            for value in option['values']
-            if value['value_index'] in available_sizes_id
-        ]
+        available_sizes_id = self.available_value_indexes(product_details)
+        option_values = self.option_values(product_details)
+        available_sizes_label = {
+            value['label'] for value in option_values if value['value_index'] in available_sizes_id
+        }
         common_sku = {
             'price': self.product_price(product_details),
             'currency': self.product_currency(product_details),
@@ -343,11 +277,11 @@ class LacosteParser(Spider):
         return [
             {
                 **common_sku,
-                'size': size,
-                'sku_id': f'{common_sku["color"]}_{size}',
-                'out_of_stock': size not in available_sizes_label,
+                'size': value['label'],
+                'sku_id': f'{common_sku["color"]}_{value["label"]}',
+                'out_of_stock': value['label'] not in available_sizes_label,
             }
-            for size in all_sizes_label
+            for value in option_values
         ]
 
     def product_description(self, product_details):
@@ -363,29 +297,40 @@ class LacosteParser(Spider):
             return [item.split(":")[1] for item in care_instructions.split(",")]
         return []
 
+    def load_json(self, raw_json):
+        if orjson:
+            return orjson.loads(raw_json)
+        return json.loads(bytes(raw_json))
+
     def extract_json_from_response(self, raw_product_details_response):
-        response_str = raw_product_details_response.decode('utf-8')
-        product_parts = response_str.split('</html>')
-        if len(product_parts) > 1:
-            product_json_str = product_parts[1].strip()
-        else:
-            product_json_str = product_parts[0].strip()
-        return json.loads(product_json_str)
+        if JSON_START_RE.match(raw_product_details_response):
+            return self.load_json(raw_product_details_response)
 
-    def parse(self, response):
-        raw_product_details = self.extract_json_from_response(response.body)
-        product_details = raw_product_details['data']['productDetail']['items']
+        html_end = raw_product_details_response.rfind(HTML_END)
+        json_start = 0 if html_end == -1 else html_end + len(HTML_END)
+        return self.load_json(memoryview(raw_product_details_response)[json_start:])
 
+    def parse_product(self, product_details, url_path):
         item = LacosteItem()
-        item['url'] = self.product_url(*product_details, response.meta['url_path'])
-        item['skus'] = self.product_sku_details(*product_details)
-        item['name'] = self.product_name(*product_details)
-        item['retailer_sku'] = self.product_retailer_sku(*product_details)
-        item['category'] = self.product_category(*product_details)
-        item['care'] = self.product_care(*product_details)
+        item['url'] = self.product_url(product_details, url_path)
+        item['skus'] = self.product_sku_details(product_details)
+        item['name'] = self.product_name(product_details)
+        item['retailer_sku'] = self.product_retailer_sku(product_details)
+        item['category'] = self.product_category(product_details)
+        item['care'] = self.product_care(product_details)
         item['brand'] = 'Lacoste'
-        item['description'] = self.product_description(*product_details)
-        item['image_url'] = self.product_images(*product_details)
-        item['gender'] = self.product_gender(*product_details)
+        item['description'] = self.product_description(product_details)
+        item['image_url'] = self.product_images(product_details)
+        item['gender'] = self.product_gender(product_details)
+
+        return item
+
+    def parse(self, response):
+        raw_product_details = self.extract_json_from_response(response.body)
+        url_paths = response.meta['url_paths']
 
-        yield item
+        for product_details in raw_product_details['data']['productDetail']['items']:
+            product_url_paths = url_paths.get(product_details['url_key']) or [response.meta['url_path']]
+            item = self.parse_product(product_details, product_url_paths[0])
+            item['url_paths'] = product_url_paths
+            yield item
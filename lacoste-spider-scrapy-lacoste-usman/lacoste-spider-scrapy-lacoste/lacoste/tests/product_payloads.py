@@ -0,0 +1,34 @@
+import json
+
+HTML_PREFIX = '<!DOCTYPE html>\n<html><head><title>Lacoste</title></head><body><div id="root"></div></body></html>\n'
+
+
+def configurable_product(url_key, sizes=4, colours=1, available_every=2):
+    size_values = [{'value_index': 1000 + index, 'label': f'{index + 1}'} for index in range(sizes)]
+    colour_values = [{'value_index': 10 + index, 'label': f'Colour {index}'} for index in range(colours)]
+    return {
+        'sku': url_key.upper(),
+        'url_key': url_key,
+        'name': f'Product {url_key}',
+        'item_category': 'Polos',
+        'item_category3': 'Men',
+        'meta_description': 'Classic fit. Cotton piqué. Ribbed collar',
+        'care_instructions': 'Wash:30°C,Iron:Low heat',
+        'price': {'regularPrice': {'amount': {'value': 3550.0, 'currency': 'THB'}}},
+        'configurable_options': [{'values': size_values}, {'values': colour_values}],
+        'variants': [
+            {
+                'attributes': [{'value_index': size['value_index']}, {'value_index': colour['value_index']}],
+                'product': {'media_gallery_entries': [{'file': f'/{url_key}/{colour["value_index"]}_{index}.jpg'}
+                                                      for index in range(3)]},
+            }
+            for colour in colour_values
+            for position, size in enumerate(size_values)
+            if position % available_every == 0
+        ],
+    }
+
+
+def product_detail_body(products, html_prefix='', indent=None):
+    payload = json.dumps({'data': {'productDetail': {'items': products}}}, ensure_ascii=False, indent=indent)
+    return (html_prefix + payload).encode('utf-8')
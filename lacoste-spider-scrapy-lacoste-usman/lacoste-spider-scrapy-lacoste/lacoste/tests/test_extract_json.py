@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from lacoste.spiders import lacoste_spider
+from lacoste.spiders.lacoste_spider import LacosteParser
+from product_payloads import HTML_PREFIX, configurable_product, product_detail_body
+
+PRODUCTS = [configurable_product('L1212-00-166'), configurable_product('PH4012-00-031', sizes=7, colours=2)]
+
+BODIES = {
+    'json': product_detail_body(PRODUCTS),
+    'html prefix': product_detail_body(PRODUCTS, HTML_PREFIX),
+    'html prefix and whitespace': product_detail_body(PRODUCTS, HTML_PREFIX + '\r\n\t '),
+    'leading whitespace': product_detail_body(PRODUCTS, '\n\n  '),
+    'indented': product_detail_body(PRODUCTS, indent=2),
+}
+
+
+def split_on_html_end(body):
+    product_parts = body.decode('utf-8').split('</html>')
+    product_json_str = product_parts[1].strip() if len(product_parts) > 1 else product_parts[0].strip()
+    return json.loads(product_json_str)
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def parser(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(lacoste_spider, 'orjson', None)
+    elif lacoste_spider.orjson is None:
+        pytest.skip('orjson is not installed')
+    return LacosteParser()
+
+
+@pytest.mark.parametrize('body', BODIES.values(), ids=BODIES.keys())
+def test_extracts_the_same_json_as_splitting_the_decoded_body(parser, body):
+    extracted = parser.extract_json_from_response(body)
+
+    assert extracted == split_on_html_end(body)
+    assert extracted['data']['productDetail']['items'] == PRODUCTS
+
+
+def test_json_containing_a_closing_html_tag_is_left_intact(parser):
+    product = dict(configurable_product('L1212-00-166'), meta_description='Size guide: </html> inside JSON')
+
+    extracted = parser.extract_json_from_response(product_detail_body([product]))
+
+    assert extracted['data']['productDetail']['items'] == [product]
+
+
+def test_html_without_json_is_an_error(parser):
+    with pytest.raises(ValueError):
+        parser.extract_json_from_response(HTML_PREFIX.encode())
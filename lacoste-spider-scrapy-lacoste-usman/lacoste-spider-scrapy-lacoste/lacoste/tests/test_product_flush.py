@@ -0,0 +1,39 @@
+from scrapy import Request
+from scrapy.http import TextResponse
+from scrapy.utils.test import get_crawler
+
+from lacoste.spiders.lacoste_spider import LacosteSpider
+from product_payloads import configurable_product, product_detail_body
+
+
+def spider(tmp_path, flush_size):
+    crawler = get_crawler(LacosteSpider, {
+        'CATEGORY_CACHE_DIR': str(tmp_path), 'LISTING_PAGE_SIZE': 12, 'LACOSTE_PRODUCT_FLUSH_SIZE': flush_size,
+    })
+    return LacosteSpider.from_crawler(crawler)
+
+
+def detail_response(url_keys):
+    url_paths = {url_key: ['men/polos'] for url_key in url_keys}
+    request = Request('https://www.lacoste.co.th/graphql', meta={'url_path': 'men/polos', 'url_paths': url_paths})
+    body = product_detail_body([configurable_product(url_key) for url_key in url_keys])
+    return TextResponse(request.url, body=body, request=request)
+
+
+def test_products_are_held_below_the_flush_size(tmp_path):
+    lacoste = spider(tmp_path, flush_size=5)
+
+    assert list(lacoste.parse_product_details(detail_response(['l1', 'l2', 'l3']))) == []
+    assert len(lacoste.products) == 3
+
+
+def test_products_are_flushed_once_the_flush_size_is_reached(tmp_path):
+    lacoste = spider(tmp_path, flush_size=5)
+    list(lacoste.parse_product_details(detail_response(['l1', 'l2', 'l3'])))
+
+    flushed = list(lacoste.parse_product_details(detail_response(['l4', 'l5', 'l6'])))
+
+    assert [item['url_paths'] for item in flushed] == [['men/polos']] * 6
+    assert [item['retailer_sku'] for item in flushed] == ['L1', 'L2', 'L3', 'L4', 'L5', 'L6']
+    assert lacoste.products == []
+    assert lacoste.crawler.stats.get_value('lacoste/early_product_flushes') == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from lacoste.spiders.lacoste_spider import LacosteParser
+from product_payloads import configurable_product
+
+
+def list_scan_available_sizes(product_details):
+    available_sizes = [variant['attributes'][0]['value_index'] for variant in product_details['variants']]
+    return [
+        value['label']
+        for option in product_details['configurable_options']
+        for value in option['values']
+        if value['value_index'] in available_sizes
+    ]
+
+
+def list_scan_sku_details(parser, product_details):
+    available_sizes_id = [variant['attributes'][0]['value_index'] for variant in product_details['variants']]
+    all_sizes_label = [value['label'] for option in product_details['configurable_options'] for value in option['values']]
+    available_sizes_label = [
+        value['label']
+        for option in product_details['configurable_options']
+        for value in option['values']
+        if value['value_index'] in available_sizes_id
+    ]
+    common_sku = {
+        'price': parser.product_price(product_details),
+        'currency': parser.product_currency(product_details),
+        'color': parser.product_colour(product_details),
+    }
+    return [
+        {
+            **common_sku,
+            'size': size,
+            'sku_id': f'{common_sku["color"]}_{size}',
+            'out_of_stock': size not in available_sizes_label,
+        }
+        for size in all_sizes_label
+    ]
+
+
+def product_with_shared_label():
+    product = configurable_product('L1212-00-166', sizes=3, colours=2, available_every=3)
+    product['configurable_options'][1]['values'][1]['label'] = '1'
+    return product
+
+
+PRODUCTS = {
+    'one size': configurable_product('RK4711-00', sizes=1),
+    'half available': configurable_product('L1212-00', sizes=8, colours=3),
+    'all available': configurable_product('PH4012-00', sizes=6, colours=2, available_every=1),
+    'none available': dict(configurable_product('DH2050-00', sizes=5), variants=[]),
+    'hundreds of variants': configurable_product('SH1100-00', sizes=300, colours=4, available_every=3),
+    'label shared across options': product_with_shared_label(),
+}
+
+
+@pytest.mark.parametrize('product', PRODUCTS.values(), ids=PRODUCTS.keys())
+def test_sku_details_match_the_list_scan(product):
+    parser = LacosteParser()
+
+    assert parser.product_sku_details(product) == list_scan_sku_details(parser, product)
+
+
+@pytest.mark.parametrize('product', PRODUCTS.values(), ids=PRODUCTS.keys())
+def test_available_sizes_match_the_list_scan(product):
+    assert LacosteParser().product_available_sizes(product) == list_scan_available_sizes(product)
@@ -1,60 +1,125 @@
+import json
+
 import scrapy
 from w3lib.url import add_or_replace_parameters
 
+from carhatt.cache import CategoryCache, ProductSignatureCache
 from carhatt.items import CarhattItem
+from carhatt.pagination import PageSizeProbe, PaginationPlanner
 
 
 class CarhattSpider(scrapy.Spider):
     name = 'carhatt'
     allowed_domains = ['carhartt-wip.co.kr']
     BASE_URL = 'https://api.carhartt-wip.co.kr/v1'
-    PRODUCTS_URL = '{base_url}/products?sort=&size=12&brandIds=15'
+    PRODUCTS_URL = '{base_url}/products?sort=&brandIds=15'
     PRODUCT_DETAIL = '{base_url}/products/{product_id}/detail'
     start_urls = [f'{BASE_URL}/categories?sourceSite=CARHARTT']
+    LISTING_SIGNATURE_FIELDS = ('productName', 'currentPrice', 'soldOut')
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.pagination = PaginationPlanner(crawler.stats, first_page=0)
+        spider.page_size_probe = PageSizeProbe.from_crawler(crawler, spider.name)
+        spider.category_cache = CategoryCache.from_crawler(crawler)
+        spider.seen_product_ids = set()
+        spider.listing_first = crawler.settings.getbool('CARHARTT_LISTING_FIRST')
+        if spider.listing_first:
+            spider.product_cache = ProductSignatureCache.from_crawler(crawler, spider.name)
+            crawler.signals.connect(spider.spider_closed, signal=scrapy.signals.spider_closed)
+        return spider
+
+    def spider_closed(self):
+        self.product_cache.save()
+
+    def start_requests(self):
+        if categories_id := self.category_cache.load(self.name):
+            yield from self.category_requests(categories_id)
+            return
+
+        yield from super().start_requests()
+
+    def products_page_url(self, category_id, page, page_size):
+        products_base_url = self.PRODUCTS_URL.format(base_url=self.BASE_URL)
+        params = {
+            'mainCategoryId': category_id,
+            'page': str(page),
+            'size': str(page_size),
+        }
+        return add_or_replace_parameters(products_base_url, params)
+
+    def category_request(self, category_id, page_size):
+        return scrapy.Request(
+            self.products_page_url(category_id, self.pagination.first_page, page_size),
+            callback=self.parse_products_pages,
+            errback=self.products_pages_failed,
+            meta={'category_id': category_id, 'page_size': page_size}
+        )
+
+    def category_requests(self, categories_id):
+        return (
+            self.category_request(category_id, self.page_size_probe.page_size)
+            for category_id in categories_id
+        )
+
+    def products_pages_failed(self, failure):
+        meta = failure.request.meta
+        if meta['page_size'] != self.page_size_probe.default_size:
+            self.page_size_probe.failed(failure)
+            yield self.category_request(meta['category_id'], self.page_size_probe.default_size)
 
     def parse(self, response):
         category_data = response.json()
+        categories_id = [
+            item['categoryId'] for item in category_data.get('payload', []) if item.get('categoryId')
+        ]
+        self.category_cache.save(self.name, categories_id)
 
-        for item in category_data.get('payload', []):
-            if category_id := item.get('categoryId'):
-                products_base_url = self.PRODUCTS_URL.format(base_url=self.BASE_URL)
-                params = {
-                    'mainCategoryId': category_id,
-                    'page': '0',
-                }
-                products_url = add_or_replace_parameters(products_base_url, params)
-
-            yield scrapy.Request(
-                    products_url,
-                    callback=self.parse_products_pages,
-                    meta={'category_id': category_id}
-                )
+        yield from self.category_requests(categories_id)
 
     def parse_products_pages(self, response):
-        products_page_info = response.json()
-        total_pages = products_page_info['payload']['totalPages']
+        yield from self.parse_products(response)
+
+        products_page_info = response.json()['payload']
         category_id = response.meta['category_id']
+        page_size = response.meta['page_size']
 
-        for page in range(total_pages+1):
-            products_base_url = self.PRODUCTS_URL.format(base_url=self.BASE_URL)
-            params = {
-                'mainCategoryId': category_id,
-                'page': str(page),
-            }
-            product_url = add_or_replace_parameters(products_base_url, params)
+        if (total_count := products_page_info.get('totalElements')) is not None:
+            products_count = len(products_page_info['content'])
+            page_size = self.page_size_probe.honoured_size(page_size, products_count, total_count)
+            total_pages = self.pagination.total_pages(total_count, page_size)
+        else:
+            total_pages = products_page_info['totalPages']
 
+        last_page = self.pagination.first_page + total_pages - 1
+        for page in self.pagination.remaining_pages(total_pages):
             yield scrapy.Request(
-                product_url,
+                self.products_page_url(category_id, page, page_size),
                 callback=self.parse_products,
+                meta={'category_id': category_id, 'page_size': page_size, 'is_last_page': page == last_page}
             )
 
     def parse_products(self, response):
         products_page = response.json()
-        products = products_page['payload']['content']
+        products = self.pagination.record_page(products_page['payload']['content'])
+        is_last_page = response.meta.get('is_last_page', True)
+        if self.page_size_probe.is_shrunk(response.meta['page_size'], len(products), is_last_page):
+            yield self.category_request(response.meta['category_id'], self.page_size_probe.default_size)
+
         parser = CarhattParser()
 
         for product in products:
             product_id = product.get('productId')
+            if product_id in self.seen_product_ids:
+                self.crawler.stats.inc_value('carhatt/duplicate_listing_products')
+                continue
+            self.seen_product_ids.add(product_id)
+
+            if self.listing_first and (item := self.listing_item(parser, product)):
+                yield item
+                continue
+
             product_detail_url = (
                 self.PRODUCT_DETAIL.format(
                     base_url=self.BASE_URL,
@@ -64,12 +129,44 @@ class CarhattSpider(scrapy.Spider):
 
             yield scrapy.Request(
                 product_detail_url,
-                callback=parser.parse,
+                callback=self.parse_product_detail if self.listing_first else parser.parse,
+                meta={'listing_product': product}
             )
 
+    def listing_signature(self, product):
+        return json.dumps([product.get(field) for field in self.LISTING_SIGNATURE_FIELDS])
+
+    def listing_item(self, parser, product):
+        if parser.has_item_fields(product):
+            self.crawler.stats.inc_value('carhatt/listing_items')
+            return parser.build_item(product)
+
+        signature = self.listing_signature(product)
+        if item_fields := self.product_cache.get(product.get('productId'), signature):
+            self.crawler.stats.inc_value('carhatt/detail_requests_avoided')
+            return parser.build_item(item_fields)
+
+        return None
+
+    def parse_product_detail(self, response):
+        product_details = response.json()['payload']
+        listing_product = response.meta['listing_product']
+        parser = CarhattParser()
+        item = parser.build_item(product_details)
+        self.product_cache.set(
+            listing_product.get('productId'), self.listing_signature(listing_product),
+            parser.item_fields(product_details)
+        )
+
+        yield item
+
 
 class CarhattParser(scrapy.Spider):
     name = 'carhatt_item'
+    ITEM_FIELDS = (
+        'productId', 'productName', 'brandName', 'genderCode', 'info', 'categoryName',
+        'productInfo', 'productImageUrls', 'productSizes', 'currentPrice',
+    )
 
     def extract_gender(self, product_details):
         gender_map = {'M': 'men', 'W': 'women', 'U': 'unisex-adults', 'C': 'C'}
@@ -121,9 +218,26 @@ class CarhattParser(scrapy.Spider):
         product_id = product_details['productId']
         return f'https://www.carhartt-wip.co.kr/product/{product_id}'
 
-    def parse(self, response):
-        raw_product = response.json()
-        product_details = raw_product['payload']
+    def item_fields(self, product_details):
+        fields = {field: product_details[field] for field in self.ITEM_FIELDS}
+        fields['productInfo'] = {
+            'color': product_details['productInfo']['color'],
+            'material': product_details['productInfo']['material'],
+        }
+        fields['productSizes'] = [
+            {'sizeCode': size_info['sizeCode'], 'currentStock': size_info['currentStock']}
+            for size_info in product_details['productSizes']
+        ]
+        return fields
+
+    def has_item_fields(self, product_details):
+        try:
+            self.item_fields(product_details)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def build_item(self, product_details):
         item = CarhattItem()
 
         item['url'] = self.extract_product_url(product_details)
@@ -137,4 +251,8 @@ class CarhattParser(scrapy.Spider):
         item['description'] = self.extract_description(product_details)
         item['skus'] = self.extract_sku(product_details)
 
-        yield item
+        return item
+
+    def parse(self, response):
+        raw_product = response.json()
+        yield self.build_item(raw_product['payload'])
@@ -0,0 +1,74 @@
+import argparse
+import sys
+import time
+from importlib import import_module
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'tests')]
+
+from scrapy import Request  # noqa: E402
+from scrapy.http import HtmlResponse  # noqa: E402
+
+from clothscraper.selectors import QueryCache  # noqa: E402
+from test_selectors import MICRODATA_PAGE, PRODUCT_URL  # noqa: E402
+
+SixPMSpiderParser = import_module('clothscraper.spiders.6pm').SixPMSpiderParser
+
+REGION_START = '<div id="breadcrumbs">'
+REGION_END = '<footer'
+
+
+def generated_page(padding):
+    header = ''.join(
+        f'<li><a href="/c/{index}">Category {index}</a><script>track({index});</script></li>'
+        for index in range(padding)
+    )
+    footer = ''.join(
+        f'<div class="tile"><a href="/p/{index}"><img src="/images/{index}.jpg" alt="Product {index}"></a></div>'
+        for index in range(padding)
+    )
+    page = MICRODATA_PAGE.format(charset='utf-8')
+    page = page.replace('<body>', f'<body><header><ul>{header}</ul></header>')
+    return page.replace('</body>', f'<footer>{footer}</footer></body>').encode('utf-8')
+
+
+def extract(query, body):
+    response = HtmlResponse(PRODUCT_URL, body=body, request=Request(PRODUCT_URL, meta={'gender': 'men'}))
+    return [dict(item) for item in SixPMSpiderParser(query=query).parse(response)]
+
+
+def benchmark(name, query, body, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        items = extract(query, body)
+    elapsed = time.perf_counter() - started
+    print(f'  {name:<14} {elapsed / repeat * 1000:8.3f} ms/page')
+    return items
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare the Selector and lxml product page backends.')
+    parser.add_argument('pages', nargs='*', type=Path, help='Saved product pages (default: a generated page)')
+    parser.add_argument('--padding', type=int, default=2000, help='Header/footer nodes around the generated page')
+    parser.add_argument('--repeat', type=int, default=200)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = [(str(path), path.read_bytes()) for path in args.pages] or [('generated', generated_page(args.padding))]
+    backends = {
+        'selector': QueryCache('selector'),
+        'lxml': QueryCache('lxml'),
+        'lxml + region': QueryCache('lxml', REGION_START.encode(), REGION_END.encode()),
+    }
+
+    for name, body in pages:
+        print(f'{name} ({len(body) / 1024:.0f} KB)')
+        results = [benchmark(backend, query, body, args.repeat) for backend, query in backends.items()]
+        print(f'  same items: {all(result == results[0] for result in results)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from itemadapter import ItemAdapter
+from scrapy.exporters import BaseItemExporter
+
+PRODUCT_SCHEMA = pa.schema([
+    ('retailer_sku', pa.string()),
+    ('name', pa.string()),
+    ('brand', pa.string()),
+    ('url', pa.string()),
+    ('gender', pa.string()),
+    ('category', pa.list_(pa.string())),
+    ('description', pa.list_(pa.string())),
+    ('care', pa.list_(pa.string())),
+    ('image_url', pa.list_(pa.struct([('colour', pa.string()), ('urls', pa.list_(pa.string()))]))),
+])
+
+SKU_SCHEMA = pa.schema([
+    ('retailer_sku', pa.string()),
+    ('sku_id', pa.string()),
+    ('colour', pa.string()),
+    ('size', pa.string()),
+    ('price', pa.float64()),
+    ('currency', pa.string()),
+    ('out_of_stock', pa.bool_()),
+])
+
+
+def as_string(value):
+    return None if value is None else str(value)
+
+
+def as_string_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [as_string(entry) for entry in value]
+    return [as_string(value)]
+
+
+def as_float(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.replace(',', '')
+    return float(value)
+
+
+class ParquetItemExporter(BaseItemExporter):
+    def __init__(self, file, sku_path=None, row_group_size=10000, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+        self.sku_path = sku_path or self.default_sku_path(file)
+        self.row_group_size = int(row_group_size)
+        self.product_rows = []
+        self.sku_rows = []
+        self.product_writer = None
+        self.sku_writer = None
+
+    def default_sku_path(self, file):
+        if not (path := getattr(file, 'name', None)) or not isinstance(path, str):
+            raise ValueError('ParquetItemExporter needs a sku_path when the feed file has no name')
+        root, extension = os.path.splitext(path)
+        return f'{root}_skus{extension or ".parquet"}'
+
+    def start_exporting(self):
+        self.product_writer = pq.ParquetWriter(self.file, PRODUCT_SCHEMA)
+        self.sku_writer = pq.ParquetWriter(self.sku_path, SKU_SCHEMA)
+
+    def image_rows(self, image_url):
+        if isinstance(image_url, dict):
+            return [
+                {'colour': as_string(colour), 'urls': as_string_list(urls)}
+                for colour, urls in image_url.items()
+            ]
+        return [{'colour': None, 'urls': as_string_list(image_url)}]
+
+    def sku_records(self, skus):
+        if isinstance(skus, dict):
+            return [{'sku_id': sku_id, **sku} for sku_id, sku in skus.items()]
+        return skus or []
+
+    def export_item(self, item):
+        product = ItemAdapter(item)
+        retailer_sku = as_string(product.get('retailer_sku'))
+
+        self.product_rows.append({
+            'retailer_sku': retailer_sku,
+            'name': as_string(product.get('name')),
+            'brand': as_string(product.get('brand')),
+            'url': as_string(product.get('url')),
+            'gender': as_string(product.get('gender')),
+            'category': as_string_list(product.get('category')),
+            'description': as_string_list(product.get('description')),
+            'care': as_string_list(product.get('care')),
+            'image_url': self.image_rows(product.get('image_url')),
+        })
+        self.sku_rows.extend(
+            {
+                'retailer_sku': retailer_sku,
+                'sku_id': as_string(sku.get('sku_id')),
+                'colour': as_string(sku.get('colour', sku.get('color'))),
+                'size': as_string(sku.get('size')),
+                'price': as_float(sku.get('price')),
+                'currency': as_string(sku.get('currency')),
+                'out_of_stock': sku.get('out_of_stock'),
+            }
+            for sku in self.sku_records(product.get('skus'))
+        )
+
+        if len(self.product_rows) >= self.row_group_size:
+            self.write_product_rows()
+        if len(self.sku_rows) >= self.row_group_size:
+            self.write_sku_rows()
+
+    def write_product_rows(self):
+        if self.product_rows:
+            self.product_writer.write_table(pa.Table.from_pylist(self.product_rows, schema=PRODUCT_SCHEMA))
+            self.product_rows = []
+
+    def write_sku_rows(self):
+        if self.sku_rows:
+            self.sku_writer.write_table(pa.Table.from_pylist(self.sku_rows, schema=SKU_SCHEMA))
+            self.sku_rows = []
+
+    def finish_exporting(self):
+        self.write_product_rows()
+        self.write_sku_rows()
+        self.product_writer.close()
+        self.sku_writer.close()
@@ -0,0 +1,69 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Offset-style parameters preferred when a first page's next link adds several at once
+PAGE_PARAMS = ('start', 'offset', 'page', 'p')
+
+
+def numeric_params(url):
+    return {name: int(value) for name, value in parse_qsl(urlsplit(url).query) if value.isdigit()}
+
+
+class PagePattern:
+    def __init__(self, url, param, value, step):
+        self.url = url
+        self.param = param
+        self.value = value
+        self.step = step
+
+    @classmethod
+    def learn(cls, current_url, next_url):
+        current, following = numeric_params(current_url), numeric_params(next_url)
+        changed = [name for name, value in following.items() if name in current and value != current[name]]
+        if not changed:
+            added = [name for name in following if name not in current]
+            changed = [name for name in added if name in PAGE_PARAMS] if len(added) > 1 else added
+        if len(changed) != 1:
+            return None
+
+        param = changed[0]
+        step = following[param] - current.get(param, 0)
+        return cls(next_url, param, following[param], step) if step > 0 else None
+
+    def page_url(self, index):
+        parts = urlsplit(self.url)
+        query = [
+            (name, str(self.value + index * self.step) if name == self.param else value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        ]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class SpeculativePages:
+    def __init__(self, pattern, stats):
+        self.pattern = pattern
+        self.stats = stats
+        self.issued = 0
+        self.stopped = False
+        self.seen_pages = set()
+
+    def next_urls(self, count):
+        if self.stopped:
+            return []
+
+        urls = [self.pattern.page_url(index) for index in range(self.issued, self.issued + count)]
+        self.issued += count
+        self.stats.inc_value('pagination/speculative_pages', count)
+        return urls
+
+    def record(self, product_links):
+        page = frozenset(product_links)
+        if not page or page in self.seen_pages:
+            self.stats.inc_value('pagination/speculative_pages_wasted')
+            self.stop()
+            return False
+
+        self.seen_pages.add(page)
+        return True
+
+    def stop(self):
+        self.stopped = True
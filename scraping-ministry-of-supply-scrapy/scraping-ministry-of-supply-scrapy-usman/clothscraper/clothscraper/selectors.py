@@ -0,0 +1,104 @@
+import codecs
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+from lxml import etree
+from parsel import Selector, SelectorList
+from parsel.csstranslator import HTMLTranslator
+
+css_translator = HTMLTranslator()
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(query):
+    return etree.XPath(query, smart_strings=False)
+
+
+@lru_cache(maxsize=None)
+def compile_css(query):
+    return compile_xpath(css_translator.css_to_xpath(query))
+
+
+def encoding_names(encoding):
+    try:
+        python_name = codecs.lookup(encoding).name
+    except LookupError:
+        return [encoding]
+    return [encoding, python_name, python_name.replace('_', '-')]
+
+
+@lru_cache(maxsize=None)
+def html_parser(encoding):
+    for name in encoding_names(encoding):
+        try:
+            return etree.HTMLParser(encoding=name)
+        except LookupError:
+            continue
+    return None
+
+
+class ResponseQuery:
+    def __init__(self, root):
+        self.root = root
+        self.results = {}
+
+    def evaluate(self, compiled_query):
+        if compiled_query not in self.results:
+            self.results[compiled_query] = compiled_query(self.root)
+        return self.results[compiled_query]
+
+    def getall(self, query):
+        return [str(result) for result in self.evaluate(compile_css(query))]
+
+    def get(self, query, default=None):
+        return next(iter(self.getall(query)), default)
+
+    def xpath_getall(self, query):
+        return [str(result) for result in self.evaluate(compile_xpath(query))]
+
+    def select(self, query):
+        return SelectorList(Selector(root=element, type='html') for element in self.evaluate(compile_css(query)))
+
+
+class QueryCache:
+    backends = ('selector', 'lxml')
+
+    def __init__(self, backend='selector', region_start=b'', region_end=b''):
+        if backend not in self.backends:
+            raise ValueError(f'Unknown HTML backend {backend!r}, expected one of {self.backends}')
+
+        self.backend = backend
+        self.region_start = region_start
+        self.region_end = region_end
+        self.queries = WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get('HTML_BACKEND', 'selector'),
+            settings.get('HTML_REGION_START', '').encode(),
+            settings.get('HTML_REGION_END', '').encode()
+        )
+
+    def region(self, body):
+        start = max(body.find(self.region_start), 0) if self.region_start else 0
+        end = body.find(self.region_end, start) if self.region_end else -1
+        return body[start:end] if end != -1 else body[start:]
+
+    def parse_region(self, response):
+        region = self.region(response.body)
+        if parser := html_parser(response.encoding):
+            return etree.fromstring(region, parser)
+
+        return etree.fromstring(region.decode(response.encoding, 'replace').encode('utf-8'), html_parser('utf-8'))
+
+    def root(self, response):
+        if self.backend == 'lxml' and (root := self.parse_region(response)) is not None:
+            return root
+
+        return response.selector.root
+
+    def __call__(self, response):
+        if response not in self.queries:
+            self.queries[response] = ResponseQuery(self.root(response))
+        return self.queries[response]
@@ -1,6 +1,10 @@
 import scrapy
 
+from clothscraper.cache import CategoryCache
 from clothscraper.items import ClothscraperItem
+from clothscraper.pagination import PagePattern, SpeculativePages
+from clothscraper.selectors import QueryCache
+from clothscraper.structured_data import product_record
 
 
 class SixPMSpiderCrawler(scrapy.Spider):
@@ -8,6 +12,21 @@ class SixPMSpiderCrawler(scrapy.Spider):
     allowed_domains = ['6pm.com']
     start_urls = ['https://www.6pm.com/']
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.category_cache = CategoryCache.from_crawler(crawler)
+        spider.page_window = crawler.settings.getint('PAGINATION_WINDOW', 4)
+        spider.product_query = QueryCache.from_settings(crawler.settings)
+        return spider
+
+    def start_requests(self):
+        if category_links := self.category_cache.load(self.name):
+            yield from self.category_requests(category_links)
+            return
+
+        yield from super().start_requests()
+
     def get_category_links(self, response):
         category_links_css = 'a:contains("View all...")::attr(href)'
         return response.css(category_links_css).getall()
@@ -24,10 +43,36 @@ class SixPMSpiderCrawler(scrapy.Spider):
         genders = ['women', 'men', 'boys', 'girls']
         return next((gender for gender in genders if gender in response.url), 'unisex-adults')
 
+    def page_request(self, url, pages=None):
+        return scrapy.Request(
+            url,
+            self.parse_category_page,
+            errback=self.page_failed,
+            meta={'pages': pages}
+        )
+
+    def page_failed(self, failure):
+        if pages := failure.request.meta['pages']:
+            pages.stop()
+
+    def next_page_requests(self, response):
+        if not (next_page := self.get_next_page(response)):
+            return []
+
+        next_url = response.urljoin(next_page)
+        if self.page_window and (pattern := PagePattern.learn(response.url, next_url)):
+            pages = SpeculativePages(pattern, self.crawler.stats)
+            return [self.page_request(url, pages) for url in pages.next_urls(self.page_window)]
+
+        return [self.page_request(next_url)]
+
     def parse_category_page(self, response):
-        parser = SixPMSpiderParser()
+        parser = SixPMSpiderParser(query=self.product_query)
         product_links = self.get_product_links(response)
         gender = self.get_gender(response)
+        pages = response.meta.get('pages')
+        if pages and not pages.record(product_links):
+            return
 
         yield from (
             scrapy.Request(
@@ -38,52 +83,72 @@ class SixPMSpiderCrawler(scrapy.Spider):
             for link in product_links
         )
 
-        if next_page := self.get_next_page(response):
-            yield scrapy.Request(
-                response.urljoin(next_page),
-                self.parse_category_page
-            )
-
-    def parse(self, response):
-        category_links = self.get_category_links(response)
+        if pages:
+            yield from (self.page_request(url, pages) for url in pages.next_urls(1))
+        else:
+            yield from self.next_page_requests(response)
 
-        yield from (
+    def category_requests(self, category_links):
+        return (
             scrapy.Request(
-                response.urljoin(link),
+                link,
                 self.parse_category_page
             )
             for link in category_links
         )
 
+    def parse(self, response):
+        category_links = [response.urljoin(link) for link in self.get_category_links(response)]
+        self.category_cache.save(self.name, category_links)
+
+        yield from self.category_requests(category_links)
+
 
 class SixPMSpiderParser(scrapy.Spider):
     name = '6pm_item'
+    query = QueryCache()
+
+    def structured_data(self, response):
+        return self.query(response).evaluate(product_record)
 
     def product_retailer_sku(self, response):
-        return response.css('span[itemprop="sku"]::text').get()
+        if sku := self.structured_data(response).get('sku'):
+            return sku
+        return self.query(response).get('span[itemprop="sku"]::text')
 
     def product_category(self, response):
-        return response.css('#breadcrumbs a::text').getall()[1:-1]
+        return self.query(response).getall('#breadcrumbs a::text')[1:-1]
 
     def product_name(self, response):
-        return response.css('span[itemprop="name"]::text').get()
+        if name := self.structured_data(response).get('name'):
+            return name
+        return self.query(response).get('span[itemprop="name"]::text')
 
     def product_brand(self, response):
+        if brand := self.structured_data(response).get('brand'):
+            return brand
         brand_name_selector = 'span[itemprop="brand"] + span::text'
-        return response.css(brand_name_selector).get()
+        return self.query(response).get(brand_name_selector)
+
+    def product_colour(self, response):
+        if colour := self.structured_data(response).get('color'):
+            return colour
+        return self.query(response).get('span:contains("Color:") + span::text')
 
     def product_images(self, response):
-        colour = response.css('span:contains("Color:") + span::text').get()
+        colour = self.product_colour(response)
         images_selector = '#productThumbnails source::attr(srcset)'
-        images = response.css(images_selector).getall()
+        images = self.query(response).getall(images_selector)
         return {colour: [img.split()[0] for img in images]}
 
     def product_sku_details(self, response):
-        colour = response.css('span:contains("Color:") + span::text').get()
-        price = response.css('span[itemprop="price"]::attr(content)').get()
-        currency = response.css('span[itemprop="priceCurrency"]::attr(content)').get()
-        sizes = response.css('input::attr(data-label)').getall()
-        stocks = response.css('input::attr(aria-label)').getall()
+        colour = self.product_colour(response)
+        structured_data = self.structured_data(response)
+        price = structured_data.get('price') or self.query(response).get('span[itemprop="price"]::attr(content)')
+        currency = structured_data.get('priceCurrency') or \
+            self.query(response).get('span[itemprop="priceCurrency"]::attr(content)')
+        sizes = self.query(response).getall('input::attr(data-label)')
+        stocks = self.query(response).getall('input::attr(aria-label)')
         out_of_stock = ['Out of Stock' in stock for stock in stocks]
 
         sku_details = {}
@@ -105,11 +170,11 @@ class SixPMSpiderParser(scrapy.Spider):
         return sku_details
 
     def product_description(self, response):
-        product_features = response.css('div[role="presentation"] li')
+        product_features = self.query(response).select('div[role="presentation"] li')
         description = [product_features.css(':first-child::text').get()]
 
         for feature in range(2, len(product_features)):
-            text = product_features[feature].css('::text').get()
+            text = next(product_features[feature].root.itertext(), None)
             description.append(text.strip().replace('\n', '') if text else '')
 
         return description
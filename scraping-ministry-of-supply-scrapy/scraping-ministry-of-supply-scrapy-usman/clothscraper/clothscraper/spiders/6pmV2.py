@@ -1,38 +1,62 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+
 import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
 from scrapy.linkextractors import LinkExtractor
 from scrapy.spiders import CrawlSpider, Rule
 
 from clothscraper.items import ClothscraperItem
+from clothscraper.selectors import QueryCache
+from clothscraper.structured_data import product_record
 
 
 class SixPMSpiderParser(scrapy.Spider):
     name = '6pm_item'
+    query = QueryCache()
+
+    def structured_data(self, response):
+        return self.query(response).evaluate(product_record)
 
     def product_retailer_sku(self, response):
-        return response.css('span[itemprop="sku"]::text').get()
+        if sku := self.structured_data(response).get('sku'):
+            return sku
+        return self.query(response).get('span[itemprop="sku"]::text')
 
     def product_category(self, response):
-        return response.css('#breadcrumbs a::text').getall()[1:-1]
+        return self.query(response).getall('#breadcrumbs a::text')[1:-1]
 
     def product_name(self, response):
-        return response.css('span[itemprop="name"]::text').get()
+        if name := self.structured_data(response).get('name'):
+            return name
+        return self.query(response).get('span[itemprop="name"]::text')
 
     def product_brand(self, response):
+        if brand := self.structured_data(response).get('brand'):
+            return brand
         brand_name_selector = 'span[itemprop="brand"] + span::text'
-        return response.css(brand_name_selector).get()
+        return self.query(response).get(brand_name_selector)
+
+    def product_colour(self, response):
+        if colour := self.structured_data(response).get('color'):
+            return colour
+        return self.query(response).get('span:contains("Color:") + span::text')
 
     def product_images(self, response):
-        colour = response.css('span:contains("Color:") + span::text').get()
+        colour = self.product_colour(response)
         images_selector = '#productThumbnails source::attr(srcset)'
-        images = response.css(images_selector).getall()
+        images = self.query(response).getall(images_selector)
         return {colour: [img.split()[0] for img in images]}
 
     def product_sku_details(self, response):
-        colour = response.css('span:contains("Color:") + span::text').get()
-        price = response.css('span[itemprop="price"]::attr(content)').get()
-        currency = response.css('span[itemprop="priceCurrency"]::attr(content)').get()
-        sizes = response.css('input::attr(data-label)').getall()
-        stocks = response.css('input::attr(aria-label)').getall()
+        colour = self.product_colour(response)
+        structured_data = self.structured_data(response)
+        price = structured_data.get('price') or self.query(response).get('span[itemprop="price"]::attr(content)')
+        currency = structured_data.get('priceCurrency') or \
+            self.query(response).get('span[itemprop="priceCurrency"]::attr(content)')
+        sizes = self.query(response).getall('input::attr(data-label)')
+        stocks = self.query(response).getall('input::attr(aria-label)')
         out_of_stock = ['Out of Stock' in stock for stock in stocks]
 
         sku_details = {}
@@ -54,11 +78,11 @@ class SixPMSpiderParser(scrapy.Spider):
         return sku_details
 
     def product_description(self, response):
-        product_features = response.css('div[role="presentation"] li')
+        product_features = self.query(response).select('div[role="presentation"] li')
         description = [product_features[0].css('::text').get()]
 
         for feature in range(2, len(product_features)):
-            text = product_features[feature].css('::text').get()
+            text = next(product_features[feature].root.itertext(), None)
             description.append(text.strip().replace('\n', '') if text else '')
 
         return description
@@ -93,10 +117,73 @@ class SixPMSpiderCrawler(CrawlSpider):
         ),
         Rule(
             LinkExtractor(restrict_css='article a'),
-            process_request='get_gender',
-            callback=SixPMSpiderParser().parse,
+            process_request='product_request',
+            callback='parse_product',
         ),
     )
+    product_key_re = re.compile(r'/product/(\d+)(?:/color/(\d+))?')
+    adult_genders = {'women', 'men', 'unisex-adults'}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.product_parser = SixPMSpiderParser()
+        spider.product_genders = {}
+        spider.products = {}
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
+    def spider_idle(self):
+        if self.products:
+            self.crawler.engine.crawl(scrapy.Request('data:,', self.flush_products, dont_filter=True))
+            raise DontCloseSpider
+
+    def flush_products(self, response):
+        products, self.products = self.products, {}
+
+        for key, item in products.items():
+            item['gender'] = self.merged_gender(self.product_genders[key])
+            yield item
+
+    def merged_gender(self, genders):
+        if len(genders) == 1:
+            return next(iter(genders))
+        if genders <= self.adult_genders:
+            return 'unisex-adults'
+        return 'unisex-kids' if not genders & self.adult_genders else 'unisex'
+
+    def product_key(self, url):
+        if match := self.product_key_re.search(urlsplit(url).path):
+            return match.groups()
+        return None
+
+    def canonical_product_url(self, url):
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+    def product_request(self, request, response):
+        request = self.get_gender(request, response)
+        if not (key := self.product_key(request.url)):
+            return request
+
+        if genders := self.product_genders.get(key):
+            genders.add(request.meta['gender'])
+            self.crawler.stats.inc_value('6pm/duplicate_product_requests')
+            return None
+
+        self.product_genders[key] = {request.meta['gender']}
+        return request.replace(
+            url=self.canonical_product_url(request.url), meta={**request.meta, 'product_key': key}
+        )
+
+    def parse_product(self, response):
+        for item in self.product_parser.parse(response):
+            if (key := response.meta.get('product_key')) is None:
+                yield item
+            elif key in self.products:
+                self.crawler.stats.inc_value('6pm/duplicate_product_items')
+            else:
+                self.products[key] = item
 
     def get_gender(self, request, response):
         if response.meta.get('gender'):
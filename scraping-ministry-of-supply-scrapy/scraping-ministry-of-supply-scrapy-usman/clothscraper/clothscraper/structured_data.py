@@ -0,0 +1,94 @@
+import json
+
+from clothscraper.selectors import compile_xpath
+
+MICRODATA_XPATH = '//*[@itemscope or @itemprop]'
+JSON_LD_XPATH = '//script[@type="application/ld+json"]/text()'
+VALUE_ATTRIBUTES = ('content', 'href', 'src', 'datetime', 'value')
+
+
+def is_item_scope(element):
+    return element.get('itemscope') is not None
+
+
+def microdata_value(element):
+    for attribute in VALUE_ATTRIBUTES:
+        if (value := element.get(attribute)) is not None:
+            return value.strip()
+    return ''.join(element.itertext()).strip()
+
+
+def item_type(item):
+    types = item.get('@type') or ''
+    types = types if isinstance(types, list) else [types]
+    return [type_name.rsplit('/', 1)[-1] for type_name in types if isinstance(type_name, str)]
+
+
+def microdata_items(root):
+    scopes = {}
+    top_level_items = []
+
+    for element in compile_xpath(MICRODATA_XPATH)(root):
+        owner = next((ancestor for ancestor in element.iterancestors() if is_item_scope(ancestor)), None)
+        if is_item_scope(element):
+            value = scopes[element] = {'@type': element.get('itemtype', '')}
+        else:
+            value = microdata_value(element)
+
+        if (item_property := element.get('itemprop')) and owner in scopes:
+            scopes[owner].setdefault(item_property, value)
+        elif is_item_scope(element):
+            top_level_items.append(value)
+
+    return top_level_items
+
+
+def json_ld_nodes(data):
+    if isinstance(data, list):
+        return [node for entry in data for node in json_ld_nodes(entry)]
+    if isinstance(data, dict):
+        return json_ld_nodes(data['@graph']) if '@graph' in data else [data]
+    return []
+
+
+def json_ld_items(root):
+    items = []
+
+    for script in compile_xpath(JSON_LD_XPATH)(root):
+        try:
+            items.extend(json_ld_nodes(json.loads(script)))
+        except ValueError:
+            continue
+
+    return items
+
+
+def first(value):
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def product_fields(product):
+    offers = first(product.get('offers'))
+    offers = offers if isinstance(offers, dict) else {}
+    brand = first(product.get('brand'))
+    fields = {
+        'sku': first(product.get('sku')),
+        'name': first(product.get('name')),
+        'brand': brand.get('name') if isinstance(brand, dict) else brand,
+        'color': first(product.get('color')),
+        'price': offers.get('price') or first(product.get('price')),
+        'priceCurrency': offers.get('priceCurrency') or first(product.get('priceCurrency')),
+    }
+    return {name: str(value) for name, value in fields.items() if value not in (None, '') and not isinstance(value, dict)}
+
+
+def product_record(root):
+    record = {}
+
+    for item in microdata_items(root) + json_ld_items(root):
+        if 'Product' in item_type(item):
+            record = {**product_fields(item), **record}
+
+    return record
@@ -0,0 +1,25 @@
+import pytest
+
+from clothscraper.pagination import PagePattern
+
+CATEGORY_URL = 'https://www.6pm.com/men-shirts-tops/CKvXARDL1wHAAQLiAgMBAhg.zso'
+
+
+@pytest.mark.parametrize('current_url, next_url, param, step', [
+    (CATEGORY_URL, f'{CATEGORY_URL}?p=1', 'p', 1),
+    (CATEGORY_URL, f'{CATEGORY_URL}?p=1&s=15', 'p', 1),
+    (f'{CATEGORY_URL}?s=15', f'{CATEGORY_URL}?s=15&p=1', 'p', 1),
+    (f'{CATEGORY_URL}?p=1', f'{CATEGORY_URL}?p=2&t=3', 'p', 1),
+])
+def test_learns_the_page_step(current_url, next_url, param, step):
+    pattern = PagePattern.learn(current_url, next_url)
+
+    assert (pattern.param, pattern.step) == (param, step)
+
+
+@pytest.mark.parametrize('current_url, next_url', [
+    (f'{CATEGORY_URL}?p=1&s=15', f'{CATEGORY_URL}?p=2&s=16'),
+    (CATEGORY_URL, f'{CATEGORY_URL}?s=15&t=3'),
+])
+def test_ambiguous_links_are_not_learned(current_url, next_url):
+    assert PagePattern.learn(current_url, next_url) is None
@@ -0,0 +1,86 @@
+from importlib import import_module
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from clothscraper.selectors import QueryCache
+
+PRODUCT_URL = 'https://www.6pm.com/p/lacoste-classic-polo/product/9012345/color/3'
+
+MICRODATA_PAGE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="{charset}"><title>Classic Polo</title></head>
+<body>
+<div id="breadcrumbs"><a href="/">Home</a> <a href="/men">Men</a> <a href="/men-shirts">Shirts</a> <a href="#">Polo</a></div>
+<div itemscope itemtype="https://schema.org/Product">
+<h1><span itemprop="brand">Brand</span><span>Lacoste</span> <span itemprop="name">Classic <!-- sale -->Polo Piqué</span></h1>
+<span itemprop="sku">9012345</span>
+<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+<span itemprop="price" content="39.99">$39.99</span><span itemprop="priceCurrency" content="USD">USD</span>
+</div>
+</div>
+<p><span>Color:</span><span>Navy Blue</span></p>
+<div id="productThumbnails"><picture><source srcset="https://m.media.com/1.jpg 1x, https://m.media.com/1@2x.jpg 2x"></picture>
+<picture><source srcset="https://m.media.com/2.jpg 1x"></picture></div>
+<form><input type="radio" data-label="S" aria-label="S"><input type="radio" data-label="M" aria-label="M Out of Stock"></form>
+<div role="presentation"><ul>
+<li>Product measurements were taken using size MD.</li>
+<li>SKU: <!-- id -->9012345</li>
+<li>100% cotton<?pi ignored?>
+ piqué.</li>
+<li><b>Machine</b> wash.</li>
+</ul></div>
+</body>
+</html>
+'''
+
+JSON_LD_PAGE = MICRODATA_PAGE.replace(
+    '<div itemscope itemtype="https://schema.org/Product">', '<div>'
+).replace(
+    '<head>',
+    '<head><script type="application/ld+json">{{"@context": "https://schema.org", "@graph": [{{"@type": "Product", '
+    '"sku": "9012345", "name": "Classic Polo Piqué", "brand": {{"@type": "Brand", "name": "Lacoste"}}, '
+    '"color": "Navy", "offers": {{"price": "34.99", "priceCurrency": "USD"}}}}]}}</script>'
+)
+
+PARSERS = [
+    import_module('clothscraper.spiders.6pm').SixPMSpiderParser,
+    import_module('clothscraper.spiders.6pmV2').SixPMSpiderParser,
+]
+
+
+def product_response(page, charset):
+    body = page.format(charset=charset).encode(charset)
+    return HtmlResponse(PRODUCT_URL, body=body, request=Request(PRODUCT_URL, meta={'gender': 'men'}))
+
+
+def extracted_fields(parser_class, backend, response):
+    parser = parser_class(query=QueryCache(backend))
+    fields = {
+        name: getattr(parser, name)(response)
+        for name in dir(parser) if name.startswith('product_')
+    }
+    fields['items'] = [dict(item) for item in parser.parse(response)]
+    return fields
+
+
+@pytest.mark.parametrize('parser_class', PARSERS)
+@pytest.mark.parametrize('page', [MICRODATA_PAGE, JSON_LD_PAGE], ids=['microdata', 'json-ld'])
+@pytest.mark.parametrize('charset', ['utf-8', 'latin-1', 'cp1252'])
+def test_backends_extract_the_same_fields(parser_class, page, charset):
+    response = product_response(page, charset)
+
+    by_selector = extracted_fields(parser_class, 'selector', response)
+    by_lxml = extracted_fields(parser_class, 'lxml', response)
+
+    assert by_lxml == by_selector
+    assert by_selector['product_retailer_sku'] == '9012345'
+    assert by_selector['product_name'] == 'Classic Polo Piqué'
+    assert by_selector['product_category'] == ['Men', 'Shirts']
+
+
+def test_lxml_backend_parses_the_body_itself():
+    response = product_response(MICRODATA_PAGE, 'latin-1')
+
+    assert QueryCache('lxml').root(response) is not response.selector.root
@@ -94,6 +94,12 @@ FEED_EXPORT_ENCODING = "utf-8"
 FEED_FORMAT = 'json'
 FEED_URI = 'out.json'
 
+# Columnar feed: a products file plus a flattened one-row-per-SKU file written in
+# row groups, e.g. `scrapy crawl <spider> -O out.parquet:parquet` (SKUs go to out_skus.parquet)
+FEED_EXPORTERS = {
+    'parquet': 'barneys.exporters.ParquetItemExporter',
+}
+
 # Proxies List
 ROTATING_PROXY_LIST = [
     '186.121.235.66:8080',
@@ -105,3 +111,18 @@ DOWNLOADER_MIDDLEWARES = {
     'rotating_proxies.middlewares.RotatingProxyMiddleware': 610,
     'rotating_proxies.middlewares.BanDetectionMiddleware': 620,
 }
+
+# Number of listing pages fetched ahead in parallel once the page parameter has been
+# learned from a next-page link (0 follows next-page links one at a time)
+PAGINATION_WINDOW = 4
+
+# Product page parsing backend: 'selector' reuses the response's Scrapy selector,
+# 'lxml' parses the raw body directly, optionally only between the region markers
+HTML_BACKEND = 'selector'
+HTML_REGION_START = ''
+HTML_REGION_END = ''
+
+# On-disk navigation/category cache, used to skip the navigation request
+# while the cached tree is younger than CATEGORY_CACHE_TTL seconds (0 disables it)
+CATEGORY_CACHE_DIR = '.category_cache'
+CATEGORY_CACHE_TTL = 86400
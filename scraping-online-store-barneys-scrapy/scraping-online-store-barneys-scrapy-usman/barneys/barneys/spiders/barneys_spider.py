@@ -1,6 +1,9 @@
 import scrapy
 
+from barneys.cache import CategoryCache
 from barneys.items import BarneysItem
+from barneys.pagination import PagePattern, SpeculativePages
+from barneys.selectors import QueryCache
 
 
 class BarneysCrawler(scrapy.Spider):
@@ -8,6 +11,21 @@ class BarneysCrawler(scrapy.Spider):
     allowed_domains = ['onlinestore.barneys.co.jp']
     start_urls = ['https://onlinestore.barneys.co.jp/']
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.category_cache = CategoryCache.from_crawler(crawler)
+        spider.page_window = crawler.settings.getint('PAGINATION_WINDOW', 4)
+        spider.product_query = QueryCache.from_settings(crawler.settings)
+        return spider
+
+    def start_requests(self):
+        if category_links := self.category_cache.load(self.name):
+            yield from self.category_requests(category_links)
+            return
+
+        yield from super().start_requests()
+
     def get_category_links(self, response):
         return response.xpath(
             '//div[@class="level-2-cc"]/preceding-sibling::a[1]/@href'
@@ -19,9 +37,35 @@ class BarneysCrawler(scrapy.Spider):
     def get_product_links(self, response):
         return response.css('.name-link::attr("href")').getall()
 
+    def page_request(self, url, pages=None):
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_category_page,
+            errback=self.page_failed,
+            meta={'pages': pages}
+        )
+
+    def page_failed(self, failure):
+        if pages := failure.request.meta['pages']:
+            pages.stop()
+
+    def next_page_requests(self, response):
+        if not (next_page := self.get_next_page(response)):
+            return []
+
+        next_url = response.urljoin(next_page)
+        if self.page_window and (pattern := PagePattern.learn(response.url, next_url)):
+            pages = SpeculativePages(pattern, self.crawler.stats)
+            return [self.page_request(url, pages) for url in pages.next_urls(self.page_window)]
+
+        return [self.page_request(next_url)]
+
     def parse_category_page(self, response):
-        parser = BarneysParser()
+        parser = BarneysParser(query=self.product_query)
         products_link = self.get_product_links(response)
+        pages = response.meta.get('pages')
+        if pages and not pages.record(products_link):
+            return
 
         yield from (
             scrapy.Request(
@@ -31,32 +75,36 @@ class BarneysCrawler(scrapy.Spider):
             for link in products_link
         )
 
-        if next_page := self.get_next_page(response):
-            yield scrapy.Request(
-                url=response.urljoin(next_page),
-                callback=self.parse_category_page
-            )
-
-    def parse(self, response):
-        category_links = self.get_category_links(response)
+        if pages:
+            yield from (self.page_request(url, pages) for url in pages.next_urls(1))
+        else:
+            yield from self.next_page_requests(response)
 
-        yield from (
+    def category_requests(self, category_links):
+        return (
             scrapy.Request(
-                url=response.urljoin(link),
+                url=link,
                 callback=self.parse_category_page
             )
             for link in category_links
         )
 
+    def parse(self, response):
+        category_links = [response.urljoin(link) for link in self.get_category_links(response)]
+        self.category_cache.save(self.name, category_links)
+
+        yield from self.category_requests(category_links)
+
 
 class BarneysParser(scrapy.Spider):
     name = 'barneys_item'
+    query = QueryCache()
 
     def extract_retailer_sku(self, response):
-        return response.css('dt:contains("・品番") + dd::text').get().strip()
+        return self.query(response).get('dt:contains("・品番") + dd::text').strip()
 
     def extract_category(self, response):
-        return response.css('dt:contains("・カテゴリー") + dd a::text').get().strip()
+        return self.query(response).get('dt:contains("・カテゴリー") + dd a::text').strip()
 
     def extract_gender(self, response):
         genders = {
@@ -64,40 +112,40 @@ class BarneysParser(scrapy.Spider):
             "メンズ": 'men',
             "キッズ＆ベビー": 'kids'
         }
-        gender = response.css('dt:contains("・タイプ") + dd a::text').get().strip()
+        gender = self.query(response).get('dt:contains("・タイプ") + dd a::text').strip()
 
         return genders.get(gender, 'unisex-adults')
 
     def extract_care(self, response):
-        return response.css('dt:contains("・素材") + dd::text').get().strip()
+        return self.query(response).get('dt:contains("・素材") + dd::text').strip()
 
     def extract_name(self, response):
-        return response.css('.product-name::text').get()
+        return self.query(response).get('.product-name::text')
 
     def extract_brand(self, response):
-        return response.css('.brand-link::text').get().strip()
+        return self.query(response).get('.brand-link::text').strip()
 
     def extract_price(self, response):
-        currency_price = response.css('.product-sales-price::text').get()
+        currency_price = self.query(response).get('.product-sales-price::text')
         return currency_price.split()[1]
 
     def extract_colour(self, response):
-        return response.css('.selectable.selected .color img::attr("alt")').get()
+        return self.query(response).get('.selectable.selected .color img::attr("alt")')
 
     def extract_colour_links(self, response):
-        return response.css('#color_select .selectable .swatchanchor::attr("href")').getall()
+        return self.query(response).getall('#color_select .selectable .swatchanchor::attr("href")')
 
     def extract_images(self, response):
         return {
-            self.extract_colour(response): response.css('.gallery-thumbs img::attr("src")').getall()
+            self.extract_colour(response): self.query(response).getall('.gallery-thumbs img::attr("src")')
         }
 
     def extract_sizes(self, response):
-        sizes = response.css('div#size_select span::text').getall()
+        sizes = self.query(response).getall('div#size_select span::text')
         return ['One_Size'] if sizes[0] == 'NONE' else sizes
 
     def extract_stock_status(self, response):
-        stock_message = response.css('.in-stock-msg::text').get()
+        stock_message = self.query(response).get('.in-stock-msg::text')
         return stock_message not in ['在庫あり', '残り1 点']
 
     def extract_sku_details(self, response):
@@ -109,37 +157,54 @@ class BarneysParser(scrapy.Spider):
         sku = {
             'colour': colour,
             'currency': 'YEN',
-            'price': price
+            'price': price,
+            'out_of_stock': self.extract_stock_status(response)
         }
         for size in sizes:
             sku['size'] = size
-            sku['out_of_stock'] = self.extract_stock_status(response)
             sku_id = f'{sku["colour"]}_{size}'
             sku_details[sku_id] = sku.copy()
 
         return sku_details
 
     def extract_description(self, response):
-        raw_product_description = response.css('.data_text::text').getall()
+        raw_product_description = self.query(response).getall('.data_text::text')
         return [
             description.strip() for description in raw_product_description if description.strip()
         ]
 
-    def parse_color_item(self, response):
-        item = response.meta['item']
+    def colour_variant_links(self, response):
+        colour_links = (
+            response.urljoin(url)
+            for url in self.extract_colour_links(response)
+            if url and "color=&" not in url
+        )
+        return [link for link in dict.fromkeys(colour_links) if link != response.url]
 
-        item['url'] = response.url
-        item['skus'] = self.extract_sku_details(response)
-        item['image_url'] = self.extract_images(response)
+    def add_colour_variant(self, variants, response):
+        try:
+            variants.add(self.extract_sku_details(response), self.extract_images(response))
+        except Exception:
+            self.logger.exception('Failed to extract the colour variant on %s', response.url)
+        finally:
+            item = variants.done()
+
+        if item:
+            yield item
+
+    def parse_color_item(self, response):
+        yield from self.add_colour_variant(response.meta['variants'], response)
 
-        yield item
+    def colour_failed(self, failure):
+        self.logger.warning('Failed to fetch the colour variant %s: %r', failure.request.url, failure.value)
+        if item := failure.request.meta['variants'].done():
+            yield item
 
     def parse(self, response):
-        raw_product_color_links = self.extract_colour_links(response)
-        product_color_links = [url for url in raw_product_color_links if url]
-        product_color_links = [response.url if "color=&" in url else url for url in product_color_links]
+        colour_links = self.colour_variant_links(response)
 
         item = BarneysItem()
+        item['url'] = response.url
         item['retailer_sku'] = self.extract_retailer_sku(response)
         item['category'] = self.extract_category(response)
         item['name'] = self.extract_name(response)
@@ -148,11 +213,33 @@ class BarneysParser(scrapy.Spider):
         item['gender'] = '' if 'home' in response.url else self.extract_gender(response)
         item['care'] = self.extract_care(response)
 
-        for link in product_color_links:
-            yield scrapy.Request(
+        variants = ColourVariants(item, len(colour_links) + 1)
+        yield from (
+            scrapy.Request(
                 url=link,
                 callback=self.parse_color_item,
+                errback=self.colour_failed,
+                dont_filter=True,
                 meta={
-                    'item': item
+                    'variants': variants
                 }
             )
+            for link in colour_links
+        )
+        yield from self.add_colour_variant(variants, response)
+
+
+class ColourVariants:
+    def __init__(self, item, pending):
+        self.item = item
+        self.item['skus'] = {}
+        self.item['image_url'] = {}
+        self.pending = pending
+
+    def add(self, skus, images):
+        self.item['skus'].update(skus)
+        self.item['image_url'].update(images)
+
+    def done(self):
+        self.pending -= 1
+        return self.item if not self.pending else None
@@ -0,0 +1,73 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'tests')]
+
+from scrapy import Request  # noqa: E402
+from scrapy.http import HtmlResponse  # noqa: E402
+
+from barneys.selectors import QueryCache  # noqa: E402
+from barneys.spiders.barneys_spider import BarneysParser  # noqa: E402
+from test_selectors import PRODUCT_PAGE, PRODUCT_URL  # noqa: E402
+
+REGION_START = '<div class="product-detail">'
+REGION_END = '<footer'
+
+
+def generated_page(padding):
+    header = ''.join(
+        f'<li><a href="/category/{index}">カテゴリー {index}</a><script>track({index});</script></li>'
+        for index in range(padding)
+    )
+    footer = ''.join(
+        f'<div class="tile"><a href="/item/{index}"><img src="/images/{index}.jpg" alt="商品 {index}"></a></div>'
+        for index in range(padding)
+    )
+    page = PRODUCT_PAGE.format(charset='utf-8', url=PRODUCT_URL)
+    page = page.replace('<body>', f'<body><header><ul>{header}</ul></header>')
+    return page.replace('</body>', f'<footer>{footer}</footer></body>').encode('utf-8')
+
+
+def extract(query, body):
+    url = f'{PRODUCT_URL}?color=01&size='
+    response = HtmlResponse(url, body=body, request=Request(url))
+    return [dict(output) for output in BarneysParser(query=query).parse(response) if not isinstance(output, Request)]
+
+
+def benchmark(name, query, body, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        items = extract(query, body)
+    elapsed = time.perf_counter() - started
+    print(f'  {name:<14} {elapsed / repeat * 1000:8.3f} ms/page')
+    return items
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare the Selector and lxml product page backends.')
+    parser.add_argument('pages', nargs='*', type=Path, help='Saved product pages (default: a generated page)')
+    parser.add_argument('--padding', type=int, default=2000, help='Header/footer nodes around the generated page')
+    parser.add_argument('--repeat', type=int, default=200)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = [(str(path), path.read_bytes()) for path in args.pages] or [('generated', generated_page(args.padding))]
+    backends = {
+        'selector': QueryCache('selector'),
+        'lxml': QueryCache('lxml'),
+        'lxml + region': QueryCache('lxml', REGION_START.encode(), REGION_END.encode()),
+    }
+
+    for name, body in pages:
+        print(f'{name} ({len(body) / 1024:.0f} KB)')
+        results = [benchmark(backend, query, body, args.repeat) for backend, query in backends.items()]
+        print(f'  same items: {all(result == results[0] for result in results)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import pytest
+
+from barneys.pagination import PagePattern
+
+CATEGORY_URL = 'https://onlinestore.barneys.co.jp/women/coats/'
+
+
+@pytest.mark.parametrize('current_url, next_url, param, step', [
+    (CATEGORY_URL, f'{CATEGORY_URL}?start=48&sz=48', 'start', 48),
+    (f'{CATEGORY_URL}?sz=48', f'{CATEGORY_URL}?sz=48&start=48', 'start', 48),
+    (f'{CATEGORY_URL}?start=48&sz=48', f'{CATEGORY_URL}?start=96&sz=48&format=page-element', 'start', 48),
+    (f'{CATEGORY_URL}?start=48', f'{CATEGORY_URL}?start=96&prefn1=7', 'start', 48),
+    (CATEGORY_URL, f'{CATEGORY_URL}?pg=2', 'pg', 2),
+])
+def test_learns_the_page_step(current_url, next_url, param, step):
+    pattern = PagePattern.learn(current_url, next_url)
+
+    assert (pattern.param, pattern.step) == (param, step)
+
+
+@pytest.mark.parametrize('current_url, next_url', [
+    (f'{CATEGORY_URL}?start=48&sz=48', f'{CATEGORY_URL}?start=96&sz=96'),
+    (CATEGORY_URL, f'{CATEGORY_URL}?cgid=12&sz=48'),
+    (f'{CATEGORY_URL}?start=96', f'{CATEGORY_URL}?start=48'),
+])
+def test_ambiguous_or_backward_links_are_not_learned(current_url, next_url):
+    assert PagePattern.learn(current_url, next_url) is None
+
+
+def test_first_page_pattern_keeps_constant_parameters():
+    pattern = PagePattern.learn(CATEGORY_URL, f'{CATEGORY_URL}?start=48&sz=48')
+
+    assert [pattern.page_url(index) for index in range(2)] == [
+        f'{CATEGORY_URL}?start=48&sz=48', f'{CATEGORY_URL}?start=96&sz=48',
+    ]
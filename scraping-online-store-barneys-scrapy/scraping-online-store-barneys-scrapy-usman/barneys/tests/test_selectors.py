@@ -0,0 +1,83 @@
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from barneys.selectors import QueryCache, html_parser
+from barneys.spiders.barneys_spider import BarneysParser
+
+PRODUCT_URL = 'https://onlinestore.barneys.co.jp/item/1234-5678'
+
+PRODUCT_PAGE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="{charset}"><title>ウールコート | BARNEYS NEW YORK</title></head>
+<body>
+<!-- header -->
+<div class="product-detail">
+<a class="brand-link" href="/brand/barneys"> BARNEYS NEW YORK </a>
+<h1 class="product-name">ウール<!-- highlight -->コート</h1>
+<div class="product-sales-price">¥ 52,800</div>
+<dl class="spec">
+<dt>・品番</dt><dd> 1234-5678 </dd>
+<dt>・カテゴリー</dt><dd><a href="/category/coat"> コート </a></dd>
+<dt>・タイプ</dt><dd><a href="/type/women">ウィメンズ</a></dd>
+<dt>・素材</dt><dd> ウール100%<!-- note --> </dd>
+</dl>
+<div class="data_text">  暖かいコート。<br>  <?pi ignored?>軽量で<!-- c -->着やすい。 </div>
+<div id="color_select"><ul>
+<li class="selectable selected"><a class="swatchanchor" href="{url}?color=01&amp;size="><span class="color"><img alt="ブラック" src="/swatch/01.jpg"></span></a></li>
+<li class="selectable"><a class="swatchanchor" href="/item/1234-5678?color=02&amp;size="><span class="color"><img alt="グレー" src="/swatch/02.jpg"></span></a></li>
+<li class="selectable"><a class="swatchanchor" href="/item/1234-5678?color=&amp;size="></a></li>
+</ul></div>
+<div id="size_select"><span>S</span><span>M</span><span>L</span></div>
+<div class="in-stock-msg">残り1 点</div>
+<div class="gallery-thumbs"><img src="/images/1234-5678_01.jpg"><img src="/images/1234-5678_02.jpg"></div>
+</div>
+</body>
+</html>
+'''
+
+ENCODINGS = ['utf-8', 'shift_jis', 'euc-jp', 'iso-2022-jp']
+
+
+def product_response(charset):
+    url = f'{PRODUCT_URL}?color=01&size='
+    body = PRODUCT_PAGE.format(charset=charset, url=PRODUCT_URL).encode(charset)
+    return HtmlResponse(url, body=body, request=Request(url))
+
+
+def extracted_fields(backend, response):
+    parser = BarneysParser(query=QueryCache(backend))
+    fields = {
+        name: getattr(parser, name)(response)
+        for name in dir(parser) if name.startswith('extract_')
+    }
+    outputs = list(parser.parse(response))
+    fields['colour_requests'] = [output.url for output in outputs if isinstance(output, Request)]
+    fields['items'] = [dict(output) for output in outputs if not isinstance(output, Request)]
+    return fields
+
+
+@pytest.mark.parametrize('charset', ENCODINGS)
+def test_backends_extract_the_same_fields(charset):
+    response = product_response(charset)
+
+    by_selector = extracted_fields('selector', response)
+    by_lxml = extracted_fields('lxml', response)
+
+    assert by_lxml == by_selector
+    assert by_selector['extract_name'] == 'ウール'
+    assert by_selector['extract_description'] == ['暖かいコート。', '軽量で', '着やすい。']
+    assert by_selector['extract_colour'] == 'ブラック'
+
+
+@pytest.mark.parametrize('charset', ENCODINGS)
+def test_lxml_backend_parses_the_body_itself(charset):
+    response = product_response(charset)
+
+    assert QueryCache('lxml').root(response) is not response.selector.root
+
+
+def test_python_encoding_names_map_to_libxml2_encodings():
+    assert html_parser('euc_jp') is not None
+    assert html_parser('euc_kr') is not None
+    assert html_parser('latin-1') is not None
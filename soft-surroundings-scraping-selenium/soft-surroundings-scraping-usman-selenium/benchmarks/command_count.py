@@ -0,0 +1,69 @@
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browser_profile import lean_chrome  # noqa: E402
+from soft_surroundings_scraper import ProductScraper, headless_chrome  # noqa: E402
+
+
+class CommandCounter:
+    def __init__(self, driver):
+        self.commands = Counter()
+        self.execute = driver.execute
+        driver.execute = self.count
+
+    def count(self, command, params=None):
+        self.commands[command] += 1
+        return self.execute(command, params)
+
+    def reset(self):
+        self.commands.clear()
+
+
+def extract(driver, counter, link, extraction):
+    driver.get(link)
+    counter.reset()
+    scraper = ProductScraper(driver)
+    started = time.perf_counter()
+    product = scraper.scrape_in_one_call('women') if extraction == 'script' else scraper.scrape('women')
+    return product, sum(counter.commands.values()), time.perf_counter() - started
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Count WebDriver commands per product for each extraction mode.')
+    parser.add_argument('links', nargs='+', help='Product page URLs')
+    parser.add_argument('--lean', action='store_true', help='Use the lean, resource-blocking Chrome profile')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    driver = lean_chrome() if args.lean else headless_chrome()
+    counter = CommandCounter(driver)
+    totals = {'fields': [0, 0.0], 'script': [0, 0.0]}
+    try:
+        for link in args.links:
+            by_fields, fields_commands, fields_time = extract(driver, counter, link, 'fields')
+            by_script, script_commands, script_time = extract(driver, counter, link, 'script')
+            totals['fields'][0] += fields_commands
+            totals['fields'][1] += fields_time
+            totals['script'][0] += script_commands
+            totals['script'][1] += script_time
+            print(
+                f'{link}\n  fields: {fields_commands} commands, {fields_time:.3f}s'
+                f'\n  script: {script_commands} commands, {script_time:.3f}s'
+                f'\n  same output: {by_fields == by_script}'
+            )
+    finally:
+        driver.quit()
+
+    for extraction, (commands, seconds) in totals.items():
+        print(f'{extraction}: {commands / len(args.links):.1f} commands, {seconds / len(args.links):.3f}s per product')
+
+
+if __name__ == '__main__':
+    main()
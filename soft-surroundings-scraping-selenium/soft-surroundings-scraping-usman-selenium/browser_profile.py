@@ -0,0 +1,61 @@
+import logging
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3',
+]
+
+BLOCKED_HOST_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*googleadservices.com*', '*doubleclick.net*',
+    '*facebook.net*', '*connect.facebook.com*', '*bat.bing.com*', '*hotjar.com*', '*criteo.com*',
+    '*criteo.net*', '*pinterest.com*', '*tiktok.com*', '*clarity.ms*', '*nr-data.net*',
+]
+
+PAGE_METRICS_SCRIPT = '''
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+const resourceBytes = resources.reduce((total, entry) => total + entry.transferSize, 0);
+
+return {
+    requests: resources.length + 1,
+    bytes: (navigation ? navigation.transferSize : 0) + resourceBytes,
+    dom_content_loaded: navigation ? navigation.domContentLoadedEventEnd / 1000 : null,
+    load: navigation && navigation.loadEventEnd ? navigation.loadEventEnd / 1000 : null
+};
+'''
+
+
+def lean_chrome_options(headless=True):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    options.page_load_strategy = 'eager'
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return options
+
+
+def lean_chrome(headless=True, blocked_urls=BLOCKED_RESOURCE_PATTERNS + BLOCKED_HOST_PATTERNS):
+    driver = webdriver.Chrome(options=lean_chrome_options(headless))
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+    return driver
+
+
+def seconds(value):
+    return 'n/a' if value is None else f'{value:.2f}s'
+
+
+def report_page_metrics(driver):
+    metrics = driver.execute_script(PAGE_METRICS_SCRIPT)
+    logger.info(
+        'Loaded %s: %d requests, %.1f KB, DOMContentLoaded %s, load %s',
+        driver.current_url, metrics['requests'], metrics['bytes'] / 1024,
+        seconds(metrics['dom_content_loaded']), seconds(metrics['load'])
+    )
+    return metrics
@@ -0,0 +1,99 @@
+import logging
+import queue
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+
+class WebDriverPool:
+    def __init__(self, driver_factory, size, max_attempts=2):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_attempts = max_attempts
+        self.drivers = [None] * size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def driver(self, worker):
+        if self.drivers[worker] is None:
+            self.drivers[worker] = self.driver_factory()
+        return self.drivers[worker]
+
+    def is_alive(self, driver):
+        try:
+            driver.execute_script('return 1;')
+            return True
+        except WebDriverException:
+            return False
+
+    def restart(self, worker):
+        driver, self.drivers[worker] = self.drivers[worker], None
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def run(self, worker, task, item):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                driver = self.driver(worker)
+            except Exception:
+                logger.exception('Could not start driver %d for %s (attempt %d)', worker, item, attempt)
+                continue
+
+            try:
+                return task(driver, item)
+            except WebDriverException:
+                if self.is_alive(driver):
+                    logger.exception('Failed to process %s', item)
+                    return None
+
+                logger.warning('Driver %d died on %s (attempt %d), restarting it', worker, item, attempt)
+                self.restart(worker)
+            except Exception:
+                logger.exception('Failed to process %s', item)
+                return None
+
+        return None
+
+    def work(self, worker, task, tasks, results):
+        while True:
+            try:
+                index, item = tasks.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                result = self.run(worker, task, item)
+            except Exception:
+                logger.exception('Failed to process %s', item)
+                result = None
+            results.put((index, result))
+
+    def map(self, task, items):
+        items = list(items)
+        tasks = queue.Queue()
+        results = queue.Queue()
+        for index, item in enumerate(items):
+            tasks.put((index, item))
+
+        for worker in range(min(self.size, len(items))):
+            threading.Thread(target=self.work, args=(worker, task, tasks, results), daemon=True).start()
+
+        finished = {}
+        for index in range(len(items)):
+            while index not in finished:
+                finished_index, result = results.get()
+                finished[finished_index] = result
+            yield finished.pop(index)
+
+    def close(self):
+        for worker, driver in enumerate(self.drivers):
+            if driver is not None:
+                self.restart(worker)
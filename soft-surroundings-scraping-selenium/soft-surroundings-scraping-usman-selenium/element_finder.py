@@ -0,0 +1,43 @@
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class ElementFinder:
+    def __init__(self, driver, timeout=2, poll_frequency=0.1):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.wait_times = defaultdict(float)
+
+    def find_all(self, css_selector):
+        return self.driver.find_elements(By.CSS_SELECTOR, css_selector)
+
+    def find_optional(self, css_selector):
+        return next(iter(self.find_all(css_selector)), None)
+
+    def find(self, css_selector, timeout=None):
+        if element := self.find_optional(css_selector):
+            return element
+
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout, self.poll_frequency).until(
+                lambda driver: self.find_optional(css_selector),
+                f'No element matches {css_selector!r}'
+            )
+        finally:
+            self.wait_times[css_selector] += time.perf_counter() - started
+
+    def wait_for(self, css_selector, timeout=None):
+        try:
+            return self.find(css_selector, timeout)
+        except TimeoutException:
+            return None
+
+    def total_wait_time(self):
+        return sum(self.wait_times.values())
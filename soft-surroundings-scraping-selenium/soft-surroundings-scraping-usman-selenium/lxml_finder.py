@@ -0,0 +1,87 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from lxml.cssselect import CSSSelector
+from selenium.common.exceptions import NoSuchElementException
+
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p',
+    'pre', 'section', 'summary', 'table', 'tr', 'ul',
+])
+HIDDEN_TAGS = frozenset(['head', 'noscript', 'script', 'style', 'template'])
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=None)
+def compile_css(css_selector):
+    return CSSSelector(css_selector)
+
+
+def collect_text(element, chunks):
+    tag = element.tag if isinstance(element.tag, str) else None
+    if tag in HIDDEN_TAGS:
+        return
+    if tag == 'br':
+        chunks.append('\n')
+        return
+
+    if tag in BLOCK_TAGS:
+        chunks.append('\n')
+    if tag and element.text:
+        chunks.append(WHITESPACE_RE.sub(' ', element.text))
+    for child in element:
+        collect_text(child, chunks)
+        if child.tail:
+            chunks.append(WHITESPACE_RE.sub(' ', child.tail))
+    if tag in BLOCK_TAGS:
+        chunks.append('\n')
+
+
+def visible_text(element):
+    chunks = []
+    collect_text(element, chunks)
+    lines = (' '.join(line.split()) for line in ''.join(chunks).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+class LxmlElement:
+    url_attributes = ('href', 'src')
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def text(self):
+        return visible_text(self.element)
+
+    def get_attribute(self, name):
+        value = self.element.get(name)
+        if value is not None and name in self.url_attributes:
+            return urljoin(self.element.base_url or '', value)
+        return value
+
+
+class LxmlFinder:
+    def __init__(self, document):
+        self.document = document
+        self.wait_times = defaultdict(float)
+
+    def find_all(self, css_selector):
+        return [LxmlElement(element) for element in compile_css(css_selector)(self.document)]
+
+    def find_optional(self, css_selector):
+        return next(iter(self.find_all(css_selector)), None)
+
+    def find(self, css_selector, timeout=None):
+        if element := self.find_optional(css_selector):
+            return element
+        raise NoSuchElementException(f'No element matches {css_selector!r}')
+
+    def wait_for(self, css_selector, timeout=None):
+        return self.find_optional(css_selector)
+
+    def total_wait_time(self):
+        return 0
@@ -0,0 +1,44 @@
+import json
+import os
+
+
+class JsonLinesWriter:
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Checkpoint(JsonLinesWriter):
+    def __init__(self, path):
+        self.done = {'category': set(), 'product': set()}
+        if os.path.exists(path):
+            self.load(path)
+        super().__init__(path)
+
+    def load(self, path):
+        with open(path, encoding='utf-8') as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                self.done[event['event']].add(event['url'])
+
+    def is_done(self, event, url):
+        return url in self.done[event]
+
+    def mark_done(self, event, url):
+        self.done[event].add(url)
+        self.write({'event': event, 'url': url})
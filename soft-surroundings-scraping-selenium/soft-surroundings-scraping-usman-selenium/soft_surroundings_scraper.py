@@ -1,16 +1,66 @@
-import json
+import argparse
+import logging
 import time
-
-from selenium.webdriver.common.by import By
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import requests
+from lxml import html
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium import webdriver
 
+from browser_profile import lean_chrome, report_page_metrics
+from driver_pool import WebDriverPool
+from element_finder import ElementFinder
+from lxml_finder import LxmlFinder
+from output import Checkpoint, JsonLinesWriter
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_FIELDS_SCRIPT = '''
+const visible = value => value.split('\\n').map(line => line.replace(/\\s+/g, ' ').trim()).filter(Boolean).join('\\n');
+const text = selector => {
+    const element = document.querySelector(selector);
+    return element ? visible(element.innerText) : null;
+};
+const all = selector => Array.from(document.querySelectorAll(selector));
+const care = document.querySelector('.fnc');
+if (care) {
+    care.scrollIntoView();
+    care.click();
+}
+const currency = document.querySelector('span[itemprop="priceCurrency"]');
+const sizes = all('.box.size');
+
+return {
+    retailer_sku: text('#itemLabelDesktop > span'),
+    name: text('#productName > span'),
+    description: text('#description'),
+    colour: text('.basesize'),
+    price: text('span[itemprop="price"]'),
+    currency: currency ? currency.getAttribute('content') : null,
+    care: care ? text('.fnc .content') : null,
+    image_urls: all('.alt_dtl').map(element => element.href || element.getAttribute('href')),
+    category: all('.pagingBreadCrumb a').map(element => visible(element.innerText)),
+    sizes: sizes.map(element => visible(element.innerText)),
+    stocks: sizes.map(element => element.getAttribute('class')),
+    url: window.location.href
+};
+'''
+REQUIRED_SCRIPT_FIELDS = ('retailer_sku', 'name', 'description', 'colour', 'price', 'currency')
+
 
 class ProductScraper:
+    slow_wait = 1
+
     def __init__(self, driver):
         self.driver = driver
+        self.finder = ElementFinder(driver)
 
     def _extract_by_css(self, css_selector):
-        return self.driver.find_element(By.CSS_SELECTOR, css_selector).text
+        return self.finder.find(css_selector).text
 
     def product_name(self):
         return self._extract_by_css("#productName > span")
@@ -25,45 +75,49 @@ class ProductScraper:
         return self._extract_by_css(".basesize")
 
     def product_care(self):
+        if not (care_details_clickable := self.finder.find_optional(".fnc")):
+            return None
+
         try:
-            care_details_clickable = self.driver.find_element(By.CSS_SELECTOR, ".fnc")
             self.driver.execute_script("arguments[0].scrollIntoView();", care_details_clickable)
             care_details_clickable.click()
             return self._extract_by_css(".fnc .content")
-        except:
+        except WebDriverException:
             return None
 
     def product_price(self):
         return float(self._extract_by_css('span[itemprop="price"]'))
 
     def product_currency(self):
-        currency_span = self.driver.find_element(By.CSS_SELECTOR, 'span[itemprop="priceCurrency"]')
+        currency_span = self.finder.find('span[itemprop="priceCurrency"]')
         return currency_span.get_attribute('content')
 
     def product_image_url(self):
         return {
             self.product_colour(): [
-                element.get_attribute("href") for element in self.driver.find_elements(By.CSS_SELECTOR, ".alt_dtl")
+                element.get_attribute("href") for element in self.finder.find_all(".alt_dtl")
             ]
         }
 
     def product_category(self):
-        return [element.text for element in self.driver.find_elements(By.CSS_SELECTOR, ".pagingBreadCrumb a")]
+        return [element.text for element in self.finder.find_all(".pagingBreadCrumb a")]
 
     def product_skus(self):
-        size_div = self.driver.find_elements(By.CSS_SELECTOR, '.box.size')
-        sizes = ['One Size']
-        stocks = ['avail']
-
-        if size_div:
-            sizes = [a.text for a in size_div]
-            stocks = [a.get_attribute('class') for a in size_div]
+        size_div = self.finder.find_all('.box.size')
+        return self.build_skus(
+            [a.text for a in size_div],
+            [a.get_attribute('class') for a in size_div],
+            {
+                'price': self.product_price(),
+                'currency': self.product_currency(),
+                'colour': self.product_colour()
+            }
+        )
 
-        common_sku = {
-            'price': self.product_price(),
-            'currency': self.product_currency(),
-            'colour': self.product_colour()
-        }
+    def build_skus(self, sizes, stocks, common_sku):
+        if not sizes:
+            sizes = ['One Size']
+            stocks = ['avail']
 
         skus = []
         for size, stock in zip(sizes, stocks):
@@ -77,80 +131,285 @@ class ProductScraper:
 
         return skus
 
+    def product_url(self):
+        return self.driver.current_url
+
+    def report_wait_times(self):
+        if (total_wait_time := self.finder.total_wait_time()) >= self.slow_wait:
+            field_wait_times = ', '.join(
+                f'{css_selector} {wait_time:.2f}s'
+                for css_selector, wait_time in self.finder.wait_times.items()
+            )
+            logger.info(
+                'Waited %.2fs for fields on %s: %s', total_wait_time, self.product_url(), field_wait_times
+            )
+
     def scrape(self, product_type):
-        return {
+        product_info = {
             'retailer_sku': self.product_retailer_id(),
             'gender': '' if product_type == 'home-wellness' else 'women',
             'category': self.product_category(),
             'brand': 'Soft Surroundings',
-            'url': self.driver.current_url,
+            'url': self.product_url(),
             'name': self.product_name(),
             'description': self.product_description(),
             'care': self.product_care(),
             'image_urls': self.product_image_url(),
             'skus': self.product_skus(),
         }
+        self.report_wait_times()
+
+        return product_info
+
+    def scrape_in_one_call(self, product_type):
+        fields = self.driver.execute_script(PRODUCT_FIELDS_SCRIPT)
+        if missing := [field for field in REQUIRED_SCRIPT_FIELDS if fields[field] is None]:
+            raise NoSuchElementException(f"Missing {', '.join(missing)} on {fields['url']}")
+
+        common_sku = {
+            'price': float(fields['price']),
+            'currency': fields['currency'],
+            'colour': fields['colour']
+        }
+
+        return {
+            'retailer_sku': fields['retailer_sku'],
+            'gender': '' if product_type == 'home-wellness' else 'women',
+            'category': fields['category'],
+            'brand': 'Soft Surroundings',
+            'url': fields['url'],
+            'name': fields['name'],
+            'description': fields['description'],
+            'care': fields['care'],
+            'image_urls': {fields['colour']: fields['image_urls']},
+            'skus': self.build_skus(fields['sizes'], fields['stocks'], common_sku),
+        }
+
+
+class HtmlProductScraper(ProductScraper):
+    def __init__(self, document, url):
+        self.driver = None
+        self.url = url
+        self.finder = LxmlFinder(document)
+
+    def product_url(self):
+        return self.url
+
+    def product_care(self):
+        if not self.finder.find_optional(".fnc"):
+            return None
+
+        care_details = self.finder.find_optional(".fnc .content")
+        return care_details.text if care_details else None
+
+
+class HttpProductFetcher:
+    def __init__(self, driver, workers):
+        self.driver = driver
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = driver.execute_script('return navigator.userAgent;')
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update_cookies(self):
+        for cookie in self.driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+
+    def fetch(self, link, product_type):
+        try:
+            response = self.session.get(link, timeout=30)
+            response.raise_for_status()
+            document = html.fromstring(response.content, base_url=response.url)
+            return HtmlProductScraper(document, response.url).scrape(product_type)
+        except Exception:
+            logger.exception('Failed to process %s', link)
+            return None
+
+    def map(self, links, product_type):
+        self.update_cookies()
+        return self.executor.map(lambda link: self.fetch(link, product_type), links)
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+
+def scrape_product(driver, link, product_type, extraction='fields', page_metrics=False):
+    driver.get(link)
+    if page_metrics:
+        report_page_metrics(driver)
+
+    scraper = ProductScraper(driver)
+    if extraction == 'script':
+        return scraper.scrape_in_one_call(product_type)
+    return scraper.scrape(product_type)
+
+
+def headless_chrome():
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    return webdriver.Chrome(options=options)
 
 
 class Crawler:
-    def __init__(self, driver):
+    def __init__(self, driver, output, checkpoint, pool=None, scroll_timeout=3, extraction='fields', http=None,
+                 page_metrics=False):
         self.driver = driver
+        self.output = output
+        self.checkpoint = checkpoint
+        self.finder = ElementFinder(driver)
+        self.pool = pool
+        self.scroll_timeout = scroll_timeout
+        self.extraction = extraction
+        self.http = http
+        self.page_metrics = page_metrics
 
     def close_dialog(self):
-        try:
-            close_dialog_button = self.driver.find_element(By.CLASS_NAME, 'ltkpopup-close')
-            close_dialog_button.click()
-        except:
-            pass
+        if close_dialog_button := self.finder.wait_for('.ltkpopup-close'):
+            try:
+                close_dialog_button.click()
+            except WebDriverException as error:
+                logger.warning('Could not close the popup dialog: %s', error.msg)
 
     def get_product_details(self, product_type):
         products_links = [
-            element.get_attribute("href") for element in self.driver.find_elements(By.CSS_SELECTOR, "a.viewProduct")
+            element.get_attribute("href") for element in self.finder.find_all("a.viewProduct")
+        ]
+        products_links = [
+            link for link in dict.fromkeys(products_links) if not self.checkpoint.is_done('product', link)
         ]
-        products_details = []
 
-        for link in products_links:
-            driver.get(link)
-            scraper = ProductScraper(driver)
-            product_info = scraper.scrape(product_type)
-            products_details.append(product_info)
+        if self.http:
+            products_details = self.http.map(products_links, product_type)
+        elif self.pool:
+            products_details = self.pool.map(
+                lambda driver, link: scrape_product(driver, link, product_type, self.extraction, self.page_metrics),
+                products_links
+            )
+        else:
+            products_details = (self.scrape_in_place(link, product_type) for link in products_links)
 
-        return products_details
+        return zip(products_links, products_details)
+
+    def scrape_in_place(self, link, product_type):
+        try:
+            return scrape_product(self.driver, link, product_type, self.extraction, self.page_metrics)
+        except Exception:
+            logger.exception('Failed to process %s', link)
+            return None
+
+    def page_state(self):
+        return self.driver.execute_script(
+            "return [document.body.scrollHeight, document.querySelectorAll('a.viewProduct').length];"
+        )
+
+    def page_grew(self, last_state):
+        def condition(driver):
+            state = self.page_state()
+            return state if state != last_state else False
+
+        return condition
 
     def scroll_down(self):
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
+        state = self.page_state()
         while True:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(5)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+            try:
+                state = WebDriverWait(self.driver, self.scroll_timeout, poll_frequency=0.2).until(
+                    self.page_grew(state)
+                )
+            except TimeoutException:
+                return state[1]
 
     def get_category_links(self):
-        categories = self.driver.find_elements(By.CSS_SELECTOR, "#menubar li.clMn.dropdown > a")
+        categories = self.finder.find_all("#menubar li.clMn.dropdown > a")
         return [a.get_attribute("href") for a in categories]
 
     def crawl(self):
         self.close_dialog()
         category_links = self.get_category_links()
-        scraped_data = {}
 
         for link in category_links:
-            driver.get(link)
-            product_type = 'home-wellness' if 'home-wellness' in link else ''
-            self.scroll_down()
-            scraped_data |= self.get_product_details(product_type)
+            if self.checkpoint.is_done('category', link):
+                logger.info('Skipping %s, already completed', link)
+                continue
 
-        with open("output.json", 'a') as json_file:
-            json.dump(scraped_data, json_file, indent=4)
+            self.driver.get(link)
+            product_type = 'home-wellness' if 'home-wellness' in link else ''
+            scroll_started = time.perf_counter()
+            products_count = self.scroll_down()
+            logger.info(
+                'Scrolled %s: %d products in %.2fs', link, products_count, time.perf_counter() - scroll_started
+            )
+
+            failed_products = 0
+            for product_link, product_info in self.get_product_details(product_type):
+                if product_info:
+                    self.output.write(product_info)
+                    self.checkpoint.mark_done('product', product_link)
+                else:
+                    failed_products += 1
+
+            if failed_products:
+                logger.warning('%d products failed in %s, leaving it open for the next run', failed_products, link)
+            else:
+                self.checkpoint.mark_done('category', link)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Scrape the Soft Surroundings catalogue.')
+    parser.add_argument('--home-page-url', default='https://www.softsurroundings.com/',
+                        help='site to crawl, e.g. a local static mirror served over localhost')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='headless browsers scraping product pages in parallel (1 scrapes them serially)')
+    parser.add_argument('--scroll-timeout', type=float, default=3,
+                        help='seconds to wait for more products after each scroll before treating the list as done')
+    parser.add_argument('--extraction', choices=['fields', 'script'], default='fields',
+                        help="'fields' reads each field through WebDriver, 'script' reads them all in one call")
+    parser.add_argument('--hybrid', action='store_true',
+                        help='use the browser only for categories and links, fetch product pages over plain HTTP')
+    parser.add_argument('--http-workers', type=int, default=16,
+                        help='concurrent product page downloads in hybrid mode')
+    parser.add_argument('--output', default='output.jsonl',
+                        help='JSON Lines file each product is appended to as soon as it is scraped')
+    parser.add_argument('--checkpoint', default='output.checkpoint.jsonl',
+                        help='completed categories and products; an interrupted run resumes from it, '
+                             'delete it (and the output) to start over')
+    parser.add_argument('--lean', action='store_true',
+                        help='headless browsers with eager page loads, no images, fonts, media or trackers')
+    parser.add_argument('--page-metrics', action='store_true',
+                        help='log requests, transferred bytes and load times of every product page')
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    HOME_PAGE_URL = 'https://www.softsurroundings.com/'
-    driver = webdriver.Chrome()
-    driver.implicitly_wait(30)
-    driver.get(HOME_PAGE_URL)
-    crawler = Crawler(driver)
-    crawler.crawl()
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    driver = lean_chrome() if args.lean else webdriver.Chrome()
+    driver.get(args.home_page_url)
+
+    http_fetcher = HttpProductFetcher(driver, args.http_workers) if args.hybrid else nullcontext()
+
+    with WebDriverPool(lean_chrome if args.lean else headless_chrome, args.workers) as pool, http_fetcher as http, \
+            JsonLinesWriter(args.output) as output, Checkpoint(args.checkpoint) as checkpoint:
+        crawler = Crawler(
+            driver, output, checkpoint,
+            pool=pool if args.workers > 1 else None,
+            scroll_timeout=args.scroll_timeout,
+            extraction=args.extraction,
+            http=http,
+            page_metrics=args.page_metrics
+        )
+        crawler.crawl()
+
     driver.quit()
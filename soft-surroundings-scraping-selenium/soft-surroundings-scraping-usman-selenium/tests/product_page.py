@@ -0,0 +1,105 @@
+from collections import Counter
+
+from soft_surroundings_scraper import PRODUCT_FIELDS_SCRIPT
+
+PRODUCT_URL = 'https://www.softsurroundings.com/p/ponte-knit-dress/'
+
+PRODUCT_PAGE = '''
+<html>
+<head><title>Ponte Knit Dress</title><script>var tracking = "not product text";</script></head>
+<body>
+<div class="pagingBreadCrumb"><a href="/women/">Women</a> / <a href="/women/dresses/">Dresses</a></div>
+<h1 id="productName"><span>Ponte   Knit
+    Dress</span></h1>
+<div id="itemLabelDesktop">Item # <span>12345</span></div>
+<div id="description">
+    <p>A fluid ponte knit that skims the body.</p>
+    <p>Pull-on style<br>with a hidden side zip.</p>
+    <ul><li>Knee length</li><li>Imported</li></ul>
+</div>
+<div class="basesize">Black</div>
+<span itemprop="price">49.95</span><span itemprop="priceCurrency" content="USD">$</span>
+<div class="fnc"><a>Fabric &amp; Care</a><div class="content">Rayon/nylon/spandex.<br>Machine wash.</div></div>
+<a class="alt_dtl" href="/images/12345_1.jpg"></a><a class="alt_dtl" href="https://cdn.example.com/12345_2.jpg"></a>
+<div class="box size notavail">S</div><div class="box size">M</div>
+</body>
+</html>
+'''
+
+# What Selenium's WebElement.text and get_attribute() return for the same page in Chrome.
+BROWSER_ELEMENTS = {
+    '#productName > span': [('Ponte Knit Dress', {})],
+    '#description': [(
+        'A fluid ponte knit that skims the body.\nPull-on style\nwith a hidden side zip.\nKnee length\nImported', {}
+    )],
+    '#itemLabelDesktop > span': [('12345', {})],
+    '.basesize': [('Black', {})],
+    'span[itemprop="price"]': [('49.95', {})],
+    'span[itemprop="priceCurrency"]': [('$', {'content': 'USD'})],
+    '.fnc': [('Fabric & Care\nRayon/nylon/spandex.\nMachine wash.', {})],
+    '.fnc .content': [('Rayon/nylon/spandex.\nMachine wash.', {})],
+    '.alt_dtl': [
+        ('', {'href': 'https://www.softsurroundings.com/images/12345_1.jpg'}),
+        ('', {'href': 'https://cdn.example.com/12345_2.jpg'}),
+    ],
+    '.pagingBreadCrumb a': [
+        ('Women', {'href': 'https://www.softsurroundings.com/women/'}),
+        ('Dresses', {'href': 'https://www.softsurroundings.com/women/dresses/'}),
+    ],
+    '.box.size': [('S', {'class': 'box size notavail'}), ('M', {'class': 'box size'})],
+}
+
+
+# Stub for what PRODUCT_FIELDS_SCRIPT is expected to return for the same page; the script is not executed.
+SCRIPT_FIELDS = {
+    'retailer_sku': '12345',
+    'name': 'Ponte Knit Dress',
+    'description': BROWSER_ELEMENTS['#description'][0][0],
+    'colour': 'Black',
+    'price': '49.95',
+    'currency': 'USD',
+    'care': 'Rayon/nylon/spandex.\nMachine wash.',
+    'image_urls': ['https://www.softsurroundings.com/images/12345_1.jpg', 'https://cdn.example.com/12345_2.jpg'],
+    'category': ['Women', 'Dresses'],
+    'sizes': ['S', 'M'],
+    'stocks': ['box size notavail', 'box size'],
+    'url': PRODUCT_URL,
+}
+
+
+class BrowserElement:
+    def __init__(self, driver, text, attributes):
+        self.driver = driver
+        self._text = text
+        self.attributes = attributes
+
+    @property
+    def text(self):
+        self.driver.commands['getElementText'] += 1
+        return self._text
+
+    def get_attribute(self, name):
+        self.driver.commands['getElementAttribute'] += 1
+        return self.attributes.get(name)
+
+    def click(self):
+        self.driver.commands['clickElement'] += 1
+
+
+class BrowserDriver:
+    current_url = PRODUCT_URL
+
+    def __init__(self, script_fields=SCRIPT_FIELDS):
+        self.script_fields = script_fields
+        self.commands = Counter()
+
+    def find_elements(self, by, css_selector):
+        self.commands['findElements'] += 1
+        return [
+            BrowserElement(self, text, attributes)
+            for text, attributes in BROWSER_ELEMENTS.get(css_selector, [])
+        ]
+
+    def execute_script(self, script, *args):
+        self.commands['executeScript'] += 1
+        return self.script_fields if script == PRODUCT_FIELDS_SCRIPT else None
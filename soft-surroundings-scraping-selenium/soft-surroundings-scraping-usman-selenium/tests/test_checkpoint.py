@@ -0,0 +1,71 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+import soft_surroundings_scraper
+from output import Checkpoint, JsonLinesWriter
+from soft_surroundings_scraper import Crawler
+
+
+class FakeElement:
+    def __init__(self, href):
+        self.href = href
+
+    def get_attribute(self, name):
+        return self.href
+
+
+class FakeDriver:
+    current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+
+def crawl(tmp_path, monkeypatch, failing_links, serial=False):
+    scraped = []
+
+    def scrape_product(driver, link, product_type, extraction='fields', page_metrics=False):
+        scraped.append(link)
+        if link in failing_links:
+            raise NoSuchElementException(f'No element matches on {link}')
+        return {'url': link}
+
+    class Pool:
+        def map(self, task, links):
+            for link in links:
+                try:
+                    yield task(None, link)
+                except NoSuchElementException:
+                    yield None
+
+    monkeypatch.setattr(soft_surroundings_scraper, 'scrape_product', scrape_product)
+    with JsonLinesWriter(tmp_path / 'output.jsonl') as output, Checkpoint(tmp_path / 'checkpoint.jsonl') as checkpoint:
+        crawler = Crawler(FakeDriver(), output, checkpoint, pool=None if serial else Pool())
+        crawler.close_dialog = lambda: None
+        crawler.get_category_links = lambda: ['cat1', 'cat2']
+        crawler.scroll_down = lambda: 0
+        crawler.finder.find_all = lambda css_selector: [
+            FakeElement(f'{crawler.driver.current_url}/p{index}') for index in range(3)
+        ]
+        crawler.crawl()
+
+    return scraped
+
+
+@pytest.mark.parametrize('serial', [False, True], ids=['pool', 'serial'])
+def test_failed_products_are_retried_on_resume(tmp_path, monkeypatch, serial):
+    first_run = crawl(tmp_path, monkeypatch, {'cat1/p2'}, serial)
+    second_run = crawl(tmp_path, monkeypatch, set(), serial)
+
+    assert first_run == ['cat1/p0', 'cat1/p1', 'cat1/p2', 'cat2/p0', 'cat2/p1', 'cat2/p2']
+    assert second_run == ['cat1/p2']
+    assert 'cat1/p2' in (tmp_path / 'output.jsonl').read_text()
+    assert crawl(tmp_path, monkeypatch, set(), serial) == []
+
+
+def test_permanently_broken_product_does_not_stop_a_serial_crawl(tmp_path, monkeypatch):
+    for _ in range(2):
+        scraped = crawl(tmp_path, monkeypatch, {'cat1/p0'}, serial=True)
+
+    assert scraped == ['cat1/p0']
+    assert (tmp_path / 'output.jsonl').read_text().count('cat2/p2') == 1
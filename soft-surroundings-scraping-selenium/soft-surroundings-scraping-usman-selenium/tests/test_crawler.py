@@ -0,0 +1,15 @@
+from selenium.common.exceptions import ElementNotInteractableException
+
+from soft_surroundings_scraper import Crawler
+
+
+class HiddenCloseButton:
+    def click(self):
+        raise ElementNotInteractableException('element not interactable')
+
+
+def test_close_dialog_survives_a_button_that_cannot_be_clicked(tmp_path):
+    crawler = Crawler(None, None, None)
+    crawler.finder.wait_for = lambda css_selector: HiddenCloseButton()
+
+    crawler.close_dialog()
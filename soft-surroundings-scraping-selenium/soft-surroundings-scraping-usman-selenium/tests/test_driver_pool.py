@@ -0,0 +1,85 @@
+import threading
+
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+
+from driver_pool import WebDriverPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException('disconnected')
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeDriverFactory:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.drivers = []
+
+    def __call__(self):
+        if self.failures:
+            self.failures -= 1
+            raise SessionNotCreatedException('Chrome failed to start')
+        self.drivers.append(FakeDriver(len(self.drivers)))
+        return self.drivers[-1]
+
+
+def run_map(pool, task, items, timeout=5):
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(pool.map(task, items)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'WebDriverPool.map() did not return'
+    return results
+
+
+def test_results_keep_the_order_of_the_items():
+    with WebDriverPool(FakeDriverFactory(), size=3) as pool:
+        assert run_map(pool, lambda driver, item: item * 2, range(10)) == [item * 2 for item in range(10)]
+
+
+def test_dead_driver_is_restarted_and_the_item_retried():
+    factory = FakeDriverFactory()
+
+    def task(driver, item):
+        if item == 'crash' and driver.number == 0:
+            driver.alive = False
+            raise WebDriverException('chrome not reachable')
+        return (item, driver.number)
+
+    with WebDriverPool(factory, size=1) as pool:
+        assert run_map(pool, task, ['ok', 'crash', 'after']) == [('ok', 0), ('crash', 1), ('after', 1)]
+
+    assert [driver.quit_called for driver in factory.drivers] == [True, True]
+
+
+def test_task_error_on_a_live_driver_is_not_retried():
+    calls = []
+
+    def task(driver, item):
+        calls.append(item)
+        raise WebDriverException('element not interactable')
+
+    with WebDriverPool(FakeDriverFactory(), size=1) as pool:
+        assert run_map(pool, task, ['broken']) == [None]
+
+    assert calls == ['broken']
+
+
+def test_factory_that_raises_does_not_hang_the_pool():
+    with WebDriverPool(FakeDriverFactory(failures=100), size=2) as pool:
+        assert run_map(pool, lambda driver, item: item, range(4)) == [None] * 4
+
+
+def test_factory_that_recovers_is_retried():
+    with WebDriverPool(FakeDriverFactory(failures=1), size=1) as pool:
+        assert run_map(pool, lambda driver, item: (item, driver.number), ['a', 'b']) == [('a', 0), ('b', 0)]
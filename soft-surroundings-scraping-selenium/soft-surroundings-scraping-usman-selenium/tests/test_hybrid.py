@@ -0,0 +1,25 @@
+from lxml import html
+
+from lxml_finder import LxmlElement
+from product_page import PRODUCT_PAGE, PRODUCT_URL, BrowserDriver
+from soft_surroundings_scraper import HtmlProductScraper, ProductScraper
+
+
+def element(markup):
+    return LxmlElement(html.fragment_fromstring(markup))
+
+
+def test_text_breaks_lines_at_block_boundaries():
+    assert element('<div><p>Para one.</p><p>Para two.</p></div>').text == 'Para one.\nPara two.'
+    assert element('<div>Line one<br>line   two</div>').text == 'Line one\nline two'
+    assert element('<div><b>Bold </b> and <i>italic</i> inline</div>').text == 'Bold and italic inline'
+    assert element('<div>Shown<script>hidden()</script><!-- note --> text</div>').text == 'Shown text'
+
+
+def test_hybrid_output_matches_browser_output():
+    document = html.fromstring(PRODUCT_PAGE, base_url=PRODUCT_URL)
+
+    hybrid = HtmlProductScraper(document, PRODUCT_URL).scrape('women')
+    browser = ProductScraper(BrowserDriver()).scrape('women')
+
+    assert hybrid == browser
@@ -0,0 +1,44 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from product_page import SCRIPT_FIELDS, BrowserDriver
+from soft_surroundings_scraper import ProductScraper
+
+
+# PRODUCT_FIELDS_SCRIPT itself needs a browser and is not run here: execute_script returns the
+# stubbed SCRIPT_FIELDS, so this only checks how the script's result is mapped onto a product.
+def test_script_fields_map_to_the_same_product_as_field_extraction():
+    by_fields = ProductScraper(BrowserDriver()).scrape('women')
+    by_script = ProductScraper(BrowserDriver()).scrape_in_one_call('women')
+
+    assert by_script == by_fields
+
+
+def test_script_extraction_builds_one_size_sku_without_size_boxes():
+    fields = dict(SCRIPT_FIELDS, sizes=[], stocks=[])
+
+    product = ProductScraper(BrowserDriver(fields)).scrape_in_one_call('home-wellness')
+
+    assert product['gender'] == ''
+    assert product['skus'] == [{
+        'size': 'One Size', 'out_of_stock': False, 'sku_id': 'Black_One Size',
+        'price': 49.95, 'currency': 'USD', 'colour': 'Black',
+    }]
+
+
+@pytest.mark.parametrize('field', ['retailer_sku', 'name', 'price'])
+def test_script_extraction_rejects_missing_required_fields(field):
+    fields = dict(SCRIPT_FIELDS, **{field: None})
+
+    with pytest.raises(NoSuchElementException, match=field):
+        ProductScraper(BrowserDriver(fields)).scrape_in_one_call('women')
+
+
+def test_script_extraction_is_one_driver_command():
+    fields_driver = BrowserDriver()
+    ProductScraper(fields_driver).scrape('women')
+    script_driver = BrowserDriver()
+    ProductScraper(script_driver).scrape_in_one_call('women')
+
+    assert sum(script_driver.commands.values()) == 1
+    assert sum(fields_driver.commands.values()) > 20